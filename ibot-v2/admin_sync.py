@@ -12,12 +12,16 @@ All columns are STRING type to preserve original data.
 """
 
 import os
-from typing import Dict, List, Optional, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
 from google.cloud import bigquery
 from google.cloud.exceptions import NotFound
 
+from utils.columns import column_names
+from utils.ndjson import ndjson_buffer
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -46,14 +50,31 @@ VALIDATION_SHEETS = [
     "Proyeksi Stok BSL",
 ]
 
-_sheets_service = None
+# Sheet ranges synced to BigQuery
+LIST_RANGE = "A1:I100"
+TYPE_VALIDATION_RANGE = "A1:Z50"
+UNIQUE_COLUMN_RANGE = "A1:J100"
+# Up to 50k rows; A:C includes shop names (Column C) used for BA Dash SHO Shopee lookups
+VALIDATION_RANGE = "A1:C50000"
+
+# Validation sheets are synced concurrently; capped to stay well under the
+# Sheets API read quota (300 requests/min)
+SYNC_MAX_WORKERS = 8
+
 _bq_client = None
+# Set once the dataset is known to exist (datasets are never dropped by
+# the sync, so this holds for the life of the process)
+_dataset_ensured = False
+
+# The Sheets service's HTTP transport (httplib2) is not thread-safe, so each
+# thread builds its own service. The BigQuery client is thread-safe and shared.
+_sheets_local = threading.local()
 
 
 def _get_sheets_service():
-    """Get authenticated Google Sheets service."""
-    global _sheets_service
-    if _sheets_service is None:
+    """Get authenticated Google Sheets service for the current thread."""
+    service = getattr(_sheets_local, "service", None)
+    if service is None:
         try:
             import google.auth
             from googleapiclient.discovery import build
@@ -61,11 +82,14 @@ def _get_sheets_service():
             credentials, _ = google.auth.default(
                 scopes=["https://www.googleapis.com/auth/spreadsheets.readonly"]
             )
-            _sheets_service = build("sheets", "v4", credentials=credentials)
+            # cache_discovery=False: use the bundled discovery doc instead of
+            # trying (and failing) to cache a fetched one
+            service = build("sheets", "v4", credentials=credentials, cache_discovery=False)
+            _sheets_local.service = service
         except Exception as e:
             logger.error(f"Failed to init Sheets service: {e}")
             return None
-    return _sheets_service
+    return service
 
 
 def _get_bq_client() -> bigquery.Client:
@@ -77,7 +101,11 @@ def _get_bq_client() -> bigquery.Client:
 
 
 def _ensure_dataset_exists():
-    """Create admin_config dataset if it doesn't exist."""
+    """Create admin_config dataset if it doesn't exist (once per process)."""
+    global _dataset_ensured
+    if _dataset_ensured:
+        return
+
     client = _get_bq_client()
     dataset_ref = bigquery.DatasetReference(PROJECT_ID, CONFIG_DATASET)
 
@@ -91,6 +119,13 @@ def _ensure_dataset_exists():
         client.create_dataset(dataset)
         logger.info(f"Created dataset {CONFIG_DATASET}")
 
+    _dataset_ensured = True
+
+
+def _sheet_range(sheet_name: str, range_spec: str) -> str:
+    """Build an A1 range string for a sheet."""
+    return f"'{sheet_name}'!{range_spec}"
+
 
 def _fetch_sheet_data(sheet_name: str, range_spec: str) -> List[List[str]]:
     """Fetch data from a sheet."""
@@ -101,7 +136,7 @@ def _fetch_sheet_data(sheet_name: str, range_spec: str) -> List[List[str]]:
     try:
         result = service.spreadsheets().values().get(
             spreadsheetId=ADMIN_SHEET_ID,
-            range=f"'{sheet_name}'!{range_spec}"
+            range=_sheet_range(sheet_name, range_spec)
         ).execute()
         return result.get("values", [])
     except Exception as e:
@@ -109,6 +144,84 @@ def _fetch_sheet_data(sheet_name: str, range_spec: str) -> List[List[str]]:
         return []
 
 
+def _range_sheet_name(range_str: str) -> str:
+    """Sheet name of an A1 range built by _sheet_range."""
+    sheet = range_str.rsplit("!", 1)[0]
+    if sheet.startswith("'") and sheet.endswith("'"):
+        sheet = sheet[1:-1].replace("''", "'")
+    return sheet
+
+
+def _sheet_titles(service) -> Optional[Set[str]]:
+    """Titles of the Admin Sheet's sheets (None if they can't be read)."""
+    try:
+        result = service.spreadsheets().get(
+            spreadsheetId=ADMIN_SHEET_ID,
+            fields="sheets.properties.title",
+        ).execute()
+    except Exception as e:
+        logger.warning(f"Failed to list Admin Sheet sheets: {e}")
+        return None
+    return {sheet["properties"]["title"] for sheet in result.get("sheets", [])}
+
+
+def _fetch_sheet_data_batch(ranges: List[str]) -> Dict[str, List[List[str]]]:
+    """
+    Fetch several ranges in one values.batchGet round-trip.
+
+    batchGet fails as a whole if any range is invalid (e.g. a renamed or
+    removed sheet). In that case the missing sheets are logged and the
+    batch is retried with the remaining ranges.
+
+    Returns:
+        Dict of {requested range: rows}; ranges of missing sheets map to []
+        (like a failed single fetch). Empty dict if the batch still fails,
+        so callers fall back to per-sheet fetches.
+    """
+    service = _get_sheets_service()
+    if not service:
+        return {}
+
+    missing: List[str] = []
+    try:
+        result = service.spreadsheets().values().batchGet(
+            spreadsheetId=ADMIN_SHEET_ID,
+            ranges=ranges,
+        ).execute()
+    except Exception as e:
+        titles = _sheet_titles(service)
+        if titles is not None:
+            missing = [r for r in ranges if _range_sheet_name(r) not in titles]
+        if not missing:
+            logger.warning(f"Batch fetch of {len(ranges)} ranges failed: {e}")
+            return {}
+
+        missing_sheets = [_range_sheet_name(r) for r in missing]
+        logger.warning(
+            f"Sheets not found in Admin Sheet: {', '.join(missing_sheets)}",
+            missing_sheets=missing_sheets,
+        )
+        ranges = [r for r in ranges if r not in missing]
+        try:
+            result = service.spreadsheets().values().batchGet(
+                spreadsheetId=ADMIN_SHEET_ID,
+                ranges=ranges,
+            ).execute() if ranges else {}
+        except Exception as e:
+            logger.warning(f"Batch fetch of {len(ranges)} ranges failed: {e}")
+            return {}
+
+    # valueRanges come back in request order; the returned "range" field is
+    # normalized by the API, so key by the requested range instead
+    value_ranges = result.get("valueRanges", [])
+    data = {
+        range_str: value_range.get("values", [])
+        for range_str, value_range in zip(ranges, value_ranges)
+    }
+    data.update({range_str: [] for range_str in missing})
+    return data
+
+
 def _table_exists(table_id: str) -> bool:
     """Check if a table exists."""
     client = _get_bq_client()
@@ -119,84 +232,109 @@ def _table_exists(table_id: str) -> bool:
         return False
 
 
-def _drop_and_create_table(table_id: str, schema: List[bigquery.SchemaField]):
-    """Drop table if exists and create new one."""
+def _sheet_table(
+    rows: List[List[str]],
+) -> Tuple[List[bigquery.SchemaField], List[Dict[str, str]]]:
+    """
+    Build the schema and load rows for a sheet mirrored as-is.
+
+    Columns are all STRING, named A, B, C, ... up to the widest row; each
+    sheet row (header row included) becomes one table row.
+
+    Returns:
+        Tuple of (schema, prepared_rows)
+    """
+    col_names = column_names(max(len(row) for row in rows))
+    schema = [
+        bigquery.SchemaField(col_name, "STRING", mode="NULLABLE")
+        for col_name in col_names
+    ]
+    prepared_rows = [
+        {col_name: "" if v is None else str(v) for col_name, v in zip(col_names, row)}
+        for row in rows
+    ]
+    return schema, prepared_rows
+
+
+def _replace_table(
+    table_id: str,
+    schema: List[bigquery.SchemaField],
+    rows: List[Dict[str, str]],
+) -> int:
+    """
+    Replace table contents (and schema) with rows in a single load job.
+
+    WRITE_TRUNCATE recreates the table atomically, so there is no separate
+    drop/create step and no streaming buffer propagation delay. Rows are
+    encoded with ndjson_buffer (orjson when installed) instead of
+    load_table_from_json, which uses stdlib json.
+
+    Returns:
+        Number of rows loaded
+    """
     client = _get_bq_client()
 
-    # Drop if exists
-    try:
-        client.delete_table(table_id)
-        logger.info(f"Dropped existing table {table_id}")
-    except NotFound:
-        pass
+    job_config = bigquery.LoadJobConfig(
+        schema=schema,
+        source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+        write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,
+    )
+
+    json_file, row_count = ndjson_buffer(rows)
+    load_job = client.load_table_from_file(json_file, table_id, job_config=job_config)
+    load_job.result()
 
-    # Create new table
-    table = bigquery.Table(table_id, schema=schema)
-    client.create_table(table)
-    logger.info(f"Created table {table_id}")
+    logger.info(f"Loaded {load_job.output_rows} rows into {table_id}")
+    return load_job.output_rows or row_count
 
 
-def sync_categories() -> Tuple[bool, int]:
+def sync_categories(rows: Optional[List[List[str]]] = None) -> Tuple[bool, int]:
     """
     Sync category configuration from List sheet to BigQuery.
 
+    Args:
+        rows: Pre-fetched List sheet values (fetched here if None)
+
     Returns:
         Tuple of (success, rows_synced)
     """
     logger.info("Syncing categories from Admin Sheet...")
 
     # Fetch List sheet data
-    rows = _fetch_sheet_data("List", "A1:I100")
+    if rows is None:
+        rows = _fetch_sheet_data("List", LIST_RANGE)
     if not rows:
         logger.error("No data found in List sheet")
         return False, 0
 
     # First row is headers
-    headers = rows[0] if rows else []
-    data_rows = rows[1:] if len(rows) > 1 else []
-
-    if not data_rows:
+    if len(rows) < 2:
         logger.warning("No category data found")
         return False, 0
 
     _ensure_dataset_exists()
 
-    # Create schema - all STRING columns using Excel-style naming
-    # Row 1 will contain the original headers
-    max_cols = max(len(row) for row in rows)
-    schema = [
-        bigquery.SchemaField(_get_column_name(i), "STRING", mode="NULLABLE")
-        for i in range(max_cols)
-    ]
+    # All STRING columns using Excel-style naming
+    # Row 1 will contain the original headers, followed by data rows
+    schema, prepared_rows = _sheet_table(rows)
 
     table_id = f"{PROJECT_ID}.{CONFIG_DATASET}.categories"
-    _drop_and_create_table(table_id, schema)
-
-    # Prepare rows - include headers as Row 1
-    prepared_rows = []
 
-    # Add header row
-    header_row = {_get_column_name(i): str(v) if v else "" for i, v in enumerate(headers)}
-    prepared_rows.append(header_row)
-
-    # Add data rows
-    for row in data_rows:
-        prepared_row = {_get_column_name(i): str(v) if v else "" for i, v in enumerate(row)}
-        prepared_rows.append(prepared_row)
-
-    # Insert rows
-    client = _get_bq_client()
-    errors = client.insert_rows_json(table_id, prepared_rows)
-
-    if errors:
-        logger.error(f"Failed to insert categories: {errors}")
+    # Replace table contents in one load job
+    try:
+        rows_loaded = _replace_table(table_id, schema, prepared_rows)
+    except Exception as e:
+        logger.error(f"Failed to load categories: {e}")
         return False, 0
 
-    logger.info(f"Synced {len(prepared_rows)} category rows (including header)")
-    return True, len(prepared_rows)
+    logger.info(f"Synced {rows_loaded} category rows (including header)")
+    return True, rows_loaded
 
 
-def sync_validation(category_name: str) -> Tuple[bool, int]:
+def sync_validation(
+    category_name: str,
+    rows: Optional[List[List[str]]] = None,
+) -> Tuple[bool, int]:
     """
     Sync validation mapping for a category from Admin Sheet to BigQuery.
 
@@ -204,15 +342,19 @@ def sync_validation(category_name: str) -> Tuple[bool, int]:
     - Column A: Brand/folder name
     - Column B: Product ID
 
+    Args:
+        category_name: Category name (sheet is "{category_name} Validation")
+        rows: Pre-fetched sheet values (fetched here if None)
+
     Returns:
         Tuple of (success, rows_synced)
     """
     sheet_name = f"{category_name} Validation"
     logger.info(f"Syncing validation: {sheet_name}")
 
-    # Fetch validation data (including header) - up to 50k rows
-    # Fetch A:C to include shop names (Column C) used for BA Dash SHO Shopee lookups
-    rows = _fetch_sheet_data(sheet_name, "A1:C50000")
+    # Fetch validation data (including header)
+    if rows is None:
+        rows = _fetch_sheet_data(sheet_name, VALIDATION_RANGE)
     if not rows:
         logger.warning(f"No validation data found for {category_name}")
         return False, 0
@@ -229,125 +371,124 @@ def sync_validation(category_name: str) -> Tuple[bool, int]:
     # Table name: sanitize category name
     table_name = category_name.lower().replace(" ", "_") + "_validation"
     table_id = f"{PROJECT_ID}.{CONFIG_DATASET}.{table_name}"
-    _drop_and_create_table(table_id, schema)
 
     # Prepare rows (all rows including header)
-    prepared_rows = []
-    for row in rows:
-        prepared_row = {
-            "A": str(row[0]).strip() if len(row) > 0 and row[0] else "",
-            "B": str(row[1]).strip() if len(row) > 1 and row[1] else "",
-            "C": str(row[2]).strip() if len(row) > 2 and row[2] else "",
+    prepared_rows = [
+        {
+            "A": str(row[0]).strip() if len(row) > 0 and row[0] is not None else "",
+            "B": str(row[1]).strip() if len(row) > 1 and row[1] is not None else "",
+            "C": str(row[2]).strip() if len(row) > 2 and row[2] is not None else "",
         }
-        prepared_rows.append(prepared_row)
-
-    # Insert rows
-    client = _get_bq_client()
+        for row in rows
+    ]
 
-    # Insert in batches
-    batch_size = 500
-    total_inserted = 0
-    for i in range(0, len(prepared_rows), batch_size):
-        batch = prepared_rows[i:i + batch_size]
-        errors = client.insert_rows_json(table_id, batch)
-        if errors:
-            logger.error(f"Insert errors for {category_name}: {errors[:3]}")
-        else:
-            total_inserted += len(batch)
+    # Replace table contents in one load job (no 500-row streaming batches)
+    try:
+        rows_loaded = _replace_table(table_id, schema, prepared_rows)
+    except Exception as e:
+        logger.error(f"Failed to load validation for {category_name}: {e}")
+        return False, 0
 
-    logger.info(f"Synced {total_inserted} validation rows for {category_name}")
-    return True, total_inserted
+    logger.info(f"Synced {rows_loaded} validation rows for {category_name}")
+    return True, rows_loaded
 
 
-def sync_type_validation() -> Tuple[bool, int]:
+def sync_type_validation(rows: Optional[List[List[str]]] = None) -> Tuple[bool, int]:
     """
     Sync Type Validation sheet from Admin Sheet to BigQuery.
 
+    Args:
+        rows: Pre-fetched Type Validation values (fetched here if None)
+
     Returns:
         Tuple of (success, rows_synced)
     """
     logger.info("Syncing Type Validation from Admin Sheet...")
 
-    rows = _fetch_sheet_data("Type Validation", "A1:Z50")
+    if rows is None:
+        rows = _fetch_sheet_data("Type Validation", TYPE_VALIDATION_RANGE)
     if not rows:
         logger.error("No data found in Type Validation sheet")
         return False, 0
 
     _ensure_dataset_exists()
 
-    # Create schema - all STRING columns using Excel-style naming
-    max_cols = max(len(row) for row in rows)
-    schema = [
-        bigquery.SchemaField(_get_column_name(i), "STRING", mode="NULLABLE")
-        for i in range(max_cols)
-    ]
+    # All STRING columns using Excel-style naming (header as Row 1)
+    schema, prepared_rows = _sheet_table(rows)
 
     table_id = f"{PROJECT_ID}.{CONFIG_DATASET}.type_validation"
-    _drop_and_create_table(table_id, schema)
 
-    # Prepare all rows (including header as Row 1)
-    prepared_rows = []
-    for row in rows:
-        prepared_row = {_get_column_name(i): str(v) if v else "" for i, v in enumerate(row)}
-        prepared_rows.append(prepared_row)
-
-    # Insert rows
-    client = _get_bq_client()
-    errors = client.insert_rows_json(table_id, prepared_rows)
-
-    if errors:
-        logger.error(f"Failed to insert type validation: {errors}")
+    # Replace table contents in one load job
+    try:
+        rows_loaded = _replace_table(table_id, schema, prepared_rows)
+    except Exception as e:
+        logger.error(f"Failed to load type validation: {e}")
         return False, 0
 
-    logger.info(f"Synced {len(prepared_rows)} type validation rows")
-    return True, len(prepared_rows)
+    logger.info(f"Synced {rows_loaded} type validation rows")
+    return True, rows_loaded
 
 
-def sync_unique_column() -> Tuple[bool, int]:
+def sync_unique_column(rows: Optional[List[List[str]]] = None) -> Tuple[bool, int]:
     """
     Sync Unique Column sheet from Admin Sheet to BigQuery.
 
     This sheet contains column alias mappings for handling
     different column names across file formats.
 
+    Args:
+        rows: Pre-fetched Unique Column values (fetched here if None)
+
     Returns:
         Tuple of (success, rows_synced)
     """
     logger.info("Syncing Unique Column from Admin Sheet...")
 
-    rows = _fetch_sheet_data("Unique Column", "A1:J100")
+    if rows is None:
+        rows = _fetch_sheet_data("Unique Column", UNIQUE_COLUMN_RANGE)
     if not rows:
         logger.warning("No data found in Unique Column sheet")
         return False, 0
 
     _ensure_dataset_exists()
 
-    # Create schema - all STRING columns using Excel-style naming
-    max_cols = max(len(row) for row in rows) if rows else 10
-    schema = [
-        bigquery.SchemaField(_get_column_name(i), "STRING", mode="NULLABLE")
-        for i in range(max_cols)
-    ]
+    # All STRING columns using Excel-style naming (header as Row 1)
+    schema, prepared_rows = _sheet_table(rows)
 
     table_id = f"{PROJECT_ID}.{CONFIG_DATASET}.unique_column"
-    _drop_and_create_table(table_id, schema)
 
-    # Prepare all rows (including header as Row 1)
-    prepared_rows = []
-    for row in rows:
-        prepared_row = {_get_column_name(i): str(v) if v else "" for i, v in enumerate(row)}
-        prepared_rows.append(prepared_row)
+    # Replace table contents in one load job
+    try:
+        rows_loaded = _replace_table(table_id, schema, prepared_rows)
+    except Exception as e:
+        logger.error(f"Failed to load unique column: {e}")
+        return False, 0
 
-    # Insert rows
-    client = _get_bq_client()
-    errors = client.insert_rows_json(table_id, prepared_rows)
+    logger.info(f"Synced {rows_loaded} unique column rows")
+    return True, rows_loaded
 
-    if errors:
-        logger.error(f"Failed to insert unique column: {errors}")
-        return False, 0
 
-    logger.info(f"Synced {len(prepared_rows)} unique column rows")
-    return True, len(prepared_rows)
+def sync_category_config() -> Tuple[bool, bool, bool]:
+    """
+    Sync the sheets category config is built from: List, Type Validation
+    and Unique Column.
+
+    Used by config.load_categories when BigQuery has no config yet. All three
+    sheets come from one batchGet round-trip; any range missing from the
+    result is fetched individually by its sync function.
+
+    Returns:
+        Tuple of (categories_synced, type_validation_synced, unique_column_synced)
+    """
+    list_range = _sheet_range("List", LIST_RANGE)
+    type_range = _sheet_range("Type Validation", TYPE_VALIDATION_RANGE)
+    unique_range = _sheet_range("Unique Column", UNIQUE_COLUMN_RANGE)
+    sheet_data = _fetch_sheet_data_batch([list_range, type_range, unique_range])
+
+    categories_synced, _ = sync_categories(sheet_data.get(list_range))
+    type_synced, _ = sync_type_validation(sheet_data.get(type_range))
+    unique_synced, _ = sync_unique_column(sheet_data.get(unique_range))
+    return categories_synced, type_synced, unique_synced
 
 
 def sync_all() -> Dict[str, any]:
@@ -369,32 +510,59 @@ def sync_all() -> Dict[str, any]:
         "errors": [],
     }
 
+    # Fetch every sheet in one batchGet round-trip. Any range missing from the
+    # result (batch failed) is fetched individually by its sync function.
+    list_range = _sheet_range("List", LIST_RANGE)
+    type_range = _sheet_range("Type Validation", TYPE_VALIDATION_RANGE)
+    unique_range = _sheet_range("Unique Column", UNIQUE_COLUMN_RANGE)
+    validation_ranges = {
+        category: _sheet_range(f"{category} Validation", VALIDATION_RANGE)
+        for category in VALIDATION_SHEETS
+    }
+    sheet_data = _fetch_sheet_data_batch(
+        [list_range, type_range, unique_range] + list(validation_ranges.values())
+    )
+
     # Sync categories (List sheet)
-    success, rows = sync_categories()
+    success, rows = sync_categories(sheet_data.get(list_range))
     results["categories"] = {"success": success, "rows": rows}
     results["total_rows"] += rows
 
     # Sync Type Validation sheet
-    success, rows = sync_type_validation()
+    success, rows = sync_type_validation(sheet_data.get(type_range))
     results["type_validation"] = {"success": success, "rows": rows}
     results["total_rows"] += rows
 
     # Sync Unique Column sheet (column aliases)
-    success, rows = sync_unique_column()
+    success, rows = sync_unique_column(sheet_data.get(unique_range))
     results["unique_column"] = {"success": success, "rows": rows}
     results["total_rows"] += rows
 
-    # Sync all validation sheets
-    for category in VALIDATION_SHEETS:
-        try:
-            success, rows = sync_validation(category)
-            results["validations"][category] = {"success": success, "rows": rows}
-            results["total_rows"] += rows
-        except Exception as e:
-            error_msg = f"{category}: {str(e)}"
-            results["errors"].append(error_msg)
-            results["validations"][category] = {"success": False, "rows": 0, "error": str(e)}
-            logger.error(f"Failed to sync {category}: {e}")
+    # Sync all validation sheets concurrently (each sync is independent and
+    # I/O-bound). Warm up the shared BigQuery client here so workers don't
+    # race to create it; each worker builds its own Sheets service.
+    _get_bq_client()
+
+    with ThreadPoolExecutor(max_workers=SYNC_MAX_WORKERS) as executor:
+        futures = {
+            category: executor.submit(
+                sync_validation,
+                category,
+                sheet_data.get(validation_ranges[category]),
+            )
+            for category in VALIDATION_SHEETS
+        }
+
+        for category, future in futures.items():
+            try:
+                success, rows = future.result()
+                results["validations"][category] = {"success": success, "rows": rows}
+                results["total_rows"] += rows
+            except Exception as e:
+                error_msg = f"{category}: {str(e)}"
+                results["errors"].append(error_msg)
+                results["validations"][category] = {"success": False, "rows": 0, "error": str(e)}
+                logger.error(f"Failed to sync {category}: {e}")
 
     duration = (datetime.now() - start_time).total_seconds()
     results["duration_seconds"] = duration
@@ -406,20 +574,6 @@ def sync_all() -> Dict[str, any]:
     return results
 
 
-def _get_column_name(index: int) -> str:
-    """
-    Convert column index to Excel-style column name.
-    0 -> A, 1 -> B, ..., 25 -> Z, 26 -> AA, 27 -> AB, etc.
-    """
-    result = ""
-    while True:
-        result = chr(ord('A') + (index % 26)) + result
-        index = index // 26 - 1
-        if index < 0:
-            break
-    return result
-
-
 # For testing
 if __name__ == "__main__":
     import json
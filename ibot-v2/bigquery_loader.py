@@ -4,41 +4,114 @@ iBot v2 BigQuery Loader
 Handles uploading parsed data to BigQuery.
 
 Insert methods:
-- Snapshot categories (BA Produk, etc.): Uses load jobs which write directly
-  to table storage. This allows DELETE to see the data immediately.
-- Append-only categories (BA Dash): Uses streaming inserts for speed.
+- Snapshot categories (BA Produk, etc.): Load jobs into a temporary staging
+  table, then one MERGE replaces the brand's rows in the target atomically.
+- Append-only categories (BA Dash): Uses a single WRITE_APPEND load job
+  instead of 500-row streaming inserts (free, atomic, no streaming buffer).
 
 Column naming: Excel-style (A, B, C, ... Z, AA, AB, etc.)
 Row 1 contains original headers for reference.
 """
 
+import functools
+import itertools
 import random
+import re
+import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
 
 from google.cloud import bigquery
 from google.cloud.exceptions import NotFound
-from google.api_core.exceptions import BadRequest, Conflict
+from google.api_core.exceptions import BadRequest, Conflict, TooManyRequests
 
 from config import CategoryConfig, settings
 from parser import ParsedFile
+from utils.columns import column_names
+from utils.ndjson import ndjson_buffer
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Table label recording that the "_header_" row has been written, so uploads
+# don't need a COUNT(*) query to find out
+HEADER_LABEL = "header_inserted"
 
-def get_column_name(index: int) -> str:
+# Polling for a table another process just created: 40 x 0.2s = ~8s max
+TABLE_POLL_ATTEMPTS = 40
+TABLE_POLL_INTERVAL = 0.2
+
+# Snapshot uploads load into a staging table that is dropped after the MERGE;
+# the expiration only matters if the process dies before the drop
+STAGE_TABLE_TTL = timedelta(hours=1)
+
+
+def _retry_wait(attempt: int, error: Optional[Exception] = None) -> float:
     """
-    Convert column index to Excel-style column name.
-    0 -> A, 1 -> B, ..., 25 -> Z, 26 -> AA, 27 -> AB, etc.
+    Seconds to wait before retrying after a rate-limit/conflict error.
+
+    Honors the server's Retry-After header when the error response carries
+    one; otherwise exponential backoff with jitter: 2^attempt + random(0-1).
     """
-    result = ""
-    while True:
-        result = chr(ord('A') + (index % 26)) + result
-        index = index // 26 - 1
-        if index < 0:
-            break
-    return result
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return (2 ** attempt) + random.random()
+
+
+@functools.lru_cache(maxsize=64)
+def _schema_for(num_columns: int) -> Tuple[bigquery.SchemaField, ...]:
+    """
+    Schema for a file with num_columns data columns, built once per width.
+
+    The SchemaField objects are shared between uploads; callers never
+    mutate them.
+    """
+    # Metadata column
+    schema = [
+        bigquery.SchemaField("_brand_code", "STRING", mode="REQUIRED"),
+    ]
+
+    # Data columns: A, B, C, ... (Excel-style)
+    for col_name in column_names(num_columns):
+        schema.append(
+            bigquery.SchemaField(
+                name=col_name,
+                field_type="STRING",
+                mode="NULLABLE",
+            )
+        )
+
+    return tuple(schema)
+
+
+def _header_row(columns: List[Tuple[str, Any]]) -> Dict[str, str]:
+    """Build the "_header_" row from (column name, header) pairs."""
+    header_row = {"_brand_code": "_header_"}
+    for col_name, header in columns:
+        header_row[col_name] = "" if header is None else str(header)
+    return header_row
+
+
+def _data_row(
+    row: Dict[str, Any],
+    columns: List[Tuple[str, Any]],
+    brand_code: str,
+) -> Dict[str, str]:
+    """
+    Convert a parsed row to Excel-style columns: None -> "", else str.
+
+    Fills a single dict in a plain loop: on Python 3.11 this is faster than
+    a dict comprehension (which runs as a nested function call per row).
+    """
+    data_row = {"_brand_code": brand_code}
+    get = row.get
+    for col_name, header in columns:
+        value = get(header)
+        data_row[col_name] = "" if value is None else str(value)
+    return data_row
 
 
 class BigQueryLoader:
@@ -52,12 +125,23 @@ class BigQueryLoader:
         self.project_id = project_id or settings.PROJECT_ID
         self.dataset_id = dataset_id or settings.BIGQUERY_DATASET
         self._client: Optional[bigquery.Client] = None
+        self._client_lock = threading.Lock()
+        # Set once the dataset is known to exist in this process
+        self._dataset_ensured: bool = False
+        # Tables known to contain the header row (in-process cache)
+        self._header_tables: Set[str] = set()
+        # Tables already ensured in this process, and the schema field names
+        # each is known to have (_brand_code, data columns, legacy columns)
+        self._tables: Dict[str, bigquery.Table] = {}
+        self._table_fields: Dict[str, FrozenSet[str]] = {}
 
     @property
     def client(self) -> bigquery.Client:
-        """Lazy-load BigQuery client."""
+        """Lazy-load BigQuery client (thread-safe)."""
         if self._client is None:
-            self._client = bigquery.Client(project=self.project_id)
+            with self._client_lock:
+                if self._client is None:
+                    self._client = bigquery.Client(project=self.project_id)
         return self._client
 
     def get_table_id(self, table_name: str) -> str:
@@ -65,7 +149,10 @@ class BigQueryLoader:
         return f"{self.project_id}.{self.dataset_id}.{table_name}"
 
     def ensure_dataset_exists(self) -> None:
-        """Create dataset if it doesn't exist."""
+        """Create dataset if it doesn't exist (checked once per process)."""
+        if self._dataset_ensured:
+            return
+
         dataset_ref = bigquery.DatasetReference(self.project_id, self.dataset_id)
 
         try:
@@ -78,28 +165,15 @@ class BigQueryLoader:
             self.client.create_dataset(dataset)
             logger.info(f"Created dataset {self.dataset_id}")
 
+        self._dataset_ensured = True
+
     def get_schema(self, num_columns: int) -> List[bigquery.SchemaField]:
         """
         Build schema with Excel-style column names.
 
         Schema: _brand_code, A, B, C, ... (all STRING)
         """
-        # Metadata column
-        schema = [
-            bigquery.SchemaField("_brand_code", "STRING", mode="REQUIRED"),
-        ]
-
-        # Data columns: A, B, C, ... (Excel-style)
-        for i in range(num_columns):
-            schema.append(
-                bigquery.SchemaField(
-                    name=get_column_name(i),
-                    field_type="STRING",
-                    mode="NULLABLE",
-                )
-            )
-
-        return schema
+        return list(_schema_for(num_columns))
 
     def ensure_table_exists(
         self,
@@ -111,9 +185,17 @@ class BigQueryLoader:
 
         Includes retry logic to handle race conditions when multiple functions
         try to create the same table simultaneously.
+
+        Tables ensured earlier in this process are returned from cache without
+        any RPC as long as they already have every requested column.
         """
         table_id = self.get_table_id(table_name)
 
+        # Steady state: schema already covers this file's columns
+        cached_fields = self._table_fields.get(table_name)
+        if cached_fields is not None and {f.name for f in schema} <= cached_fields:
+            return self._tables[table_name]
+
         for attempt in range(max_retries):
             try:
                 table = self.client.get_table(table_id)
@@ -127,9 +209,10 @@ class BigQueryLoader:
                     # Add new fields (BigQuery allows adding nullable columns)
                     updated_schema = list(table.schema) + new_fields
                     table.schema = updated_schema
-                    self.client.update_table(table, ["schema"])
+                    table = self.client.update_table(table, ["schema"])
                     logger.info(f"Updated schema for {table_name}: added {len(new_fields)} columns")
 
+                self._cache_table(table_name, table)
                 return table
 
             except NotFound:
@@ -143,187 +226,99 @@ class BigQueryLoader:
                     table = self.client.create_table(table)
                     logger.info(f"Created table {table_name} with {len(schema)} columns")
 
-                    # Wait for table to be fully propagated
-                    # This is critical for preventing race conditions
-                    time.sleep(8)
-
+                    # No propagation wait needed: rows are written with load
+                    # jobs, which see the table as soon as create_table returns
+                    self._cache_table(table_name, table)
                     return table
 
                 except Conflict:
-                    # Table was created by another concurrent function
-                    # Wait with exponential backoff and retry
-                    wait_time = (2 ** attempt) + random.random()
+                    # Table was created by another concurrent function.
+                    # Poll until it is visible instead of backing off blindly,
+                    # then retry (picks up the schema check + cache).
                     logger.info(
                         f"Table {table_name} created by another process, "
-                        f"waiting {wait_time:.1f}s before retry..."
+                        f"waiting for it to become visible..."
                     )
-                    time.sleep(wait_time)
+                    self._wait_for_table(table_id)
                     continue
 
-        # All retries exhausted, try one more get with a final wait
-        time.sleep(3)
-        return self.client.get_table(table_id)
+        # All retries exhausted, try one more (polling) get
+        return self._wait_for_table(table_id)
 
-    def prepare_rows(
-        self,
-        parsed_file: ParsedFile,
-        brand_code: str,
-        import_id: str,
-    ) -> Tuple[Dict[str, str], List[Dict[str, Any]]]:
-        """
-        Prepare rows for BigQuery insert.
-
-        Returns:
-            Tuple of (header_row, data_rows)
-            - header_row: Row with original column headers (brand_code = "_header_")
-            - data_rows: Actual data rows with Excel-style column names
-        """
-        # Build header row (Row 1 in BigQuery)
-        header_row = {"_brand_code": "_header_"}
-        for i, header in enumerate(parsed_file.headers):
-            col_name = get_column_name(i)
-            header_row[col_name] = str(header) if header else ""
-
-        # Build data rows
-        data_rows = []
-        for row in parsed_file.rows:
-            prepared_row = {"_brand_code": brand_code}
-
-            for i, header in enumerate(parsed_file.headers):
-                col_name = get_column_name(i)
-                value = row.get(header, "")
-                # Convert value to string, handle None
-                if value is None:
-                    prepared_row[col_name] = ""
-                else:
-                    prepared_row[col_name] = str(value)
+    def _wait_for_table(self, table_id: str) -> bigquery.Table:
+        """Poll get_table until a just-created table is visible (~8s max)."""
+        for _ in range(TABLE_POLL_ATTEMPTS - 1):
+            try:
+                return self.client.get_table(table_id)
+            except NotFound:
+                time.sleep(TABLE_POLL_INTERVAL)
+        return self.client.get_table(table_id)
 
-            data_rows.append(prepared_row)
+    def _cache_table(self, table_name: str, table: bigquery.Table) -> None:
+        """Remember an ensured table and the schema field names it has."""
+        self._tables[table_name] = table
+        self._table_fields[table_name] = (
+            frozenset(f.name for f in table.schema)
+            | self._table_fields.get(table_name, frozenset())
+        )
 
-        return header_row, data_rows
+    def forget_table(self, table_name: str) -> None:
+        """Drop cached table state (e.g. after a failed load, in case it was dropped)."""
+        self._tables.pop(table_name, None)
+        self._table_fields.pop(table_name, None)
+        self._header_tables.discard(table_name)
 
-    def streaming_insert(
+    def iter_rows(
         self,
-        table_name: str,
-        rows: List[Dict[str, Any]],
-        batch_size: int = 500,
-        max_retries: int = 5,
-    ) -> Tuple[int, List[str]]:
+        parsed_file: ParsedFile,
+        brand_code: str,
+        include_header: bool = False,
+    ) -> Iterator[Dict[str, str]]:
         """
-        Insert rows using streaming API.
+        Generate rows for BigQuery insert, one at a time.
 
-        Includes retry logic for table not found errors (race condition
-        when multiple functions create table simultaneously).
+        Yields:
+            - header row first if include_header: original column headers
+              (brand_code = "_header_")
+            - data rows with Excel-style column names
         """
-        table_id = self.get_table_id(table_name)
-
-        # Retry loop for getting the table (handles race condition)
-        table = None
-        for attempt in range(max_retries):
-            try:
-                table = self.client.get_table(table_id)
-                break
-            except NotFound:
-                if attempt < max_retries - 1:
-                    wait_time = (2 ** attempt) + random.random()
-                    logger.warning(
-                        f"Table {table_name} not found, retrying in {wait_time:.1f}s "
-                        f"(attempt {attempt + 1}/{max_retries})"
-                    )
-                    time.sleep(wait_time)
-                else:
-                    raise
-
-        total_inserted = 0
-        errors = []
-
-        # Process in batches with retry for streaming API consistency
-        for i in range(0, len(rows), batch_size):
-            batch = rows[i:i + batch_size]
-            batch_inserted = False
+        # (column name, header) pairs, computed once per file (not per row)
+        columns = list(zip(column_names(len(parsed_file.headers)), parsed_file.headers))
 
-            # Retry loop for insert (handles streaming API eventual consistency)
-            for attempt in range(max_retries):
-                try:
-                    insert_errors = self.client.insert_rows_json(table, batch)
-
-                    if insert_errors:
-                        # Check if it's a "table not found" error
-                        first_error = str(insert_errors[0].get('errors', ''))
-                        if 'not found' in first_error.lower() and attempt < max_retries - 1:
-                            wait_time = (2 ** attempt) + random.random()
-                            logger.warning(
-                                f"Insert failed (table not ready), retrying in {wait_time:.1f}s "
-                                f"(attempt {attempt + 1}/{max_retries})"
-                            )
-                            time.sleep(wait_time)
-                            # Refresh table reference
-                            table = self.client.get_table(table_id)
-                            continue
-
-                        for error in insert_errors:
-                            error_msg = f"Row {error['index']}: {error['errors']}"
-                            errors.append(error_msg)
-                            logger.warning(f"Insert error: {error_msg}")
-                    else:
-                        total_inserted += len(batch)
-
-                    batch_inserted = True
-                    break
-
-                except NotFound:
-                    if attempt < max_retries - 1:
-                        wait_time = (2 ** attempt) + random.random()
-                        logger.warning(
-                            f"Table not found during insert, retrying in {wait_time:.1f}s "
-                            f"(attempt {attempt + 1}/{max_retries})"
-                        )
-                        time.sleep(wait_time)
-                        # Refresh table reference
-                        table = self.client.get_table(table_id)
-                    else:
-                        raise
-
-            logger.debug(f"Inserted batch {i // batch_size + 1}: {len(batch)} rows")
-
-        logger.info(
-            f"Streaming insert complete: {total_inserted}/{len(rows)} rows",
-            table=table_name,
-            errors=len(errors),
-        )
+        if include_header:
+            yield _header_row(columns)
 
-        return total_inserted, errors
+        for row in parsed_file.rows:
+            yield _data_row(row, columns, brand_code)
 
     def load_job_insert(
         self,
         table_name: str,
-        rows: List[Dict[str, Any]],
-        schema: List[bigquery.SchemaField],
+        rows: Iterable[Dict[str, Any]],
     ) -> Tuple[int, List[str]]:
         """
-        Insert rows using BigQuery load job (not streaming).
+        Append rows to a table in a single load job.
+
+        Uses a load job instead of the insertAll streaming API (or the
+        Storage Write API): load jobs are free, atomic, not subject to per-row
+        streaming quota, and write directly to table storage rather than the
+        streaming buffer, so DML (DELETE/UPDATE/MERGE) sees the data as soon
+        as the job completes.
 
-        Load jobs write directly to table storage, NOT the streaming buffer.
-        This means DML (DELETE/UPDATE) can see the data immediately.
-        Better for batch operations like BA Produk daily snapshots.
+        Rows are serialized with dumps_row (orjson when installed) rather than
+        handed to load_table_from_json, which encodes them with stdlib json.
 
         Args:
             table_name: Target table name
-            rows: List of row dicts to insert
-            schema: Table schema
+            rows: Row dicts to insert (any iterable, e.g. iter_rows)
 
         Returns:
             Tuple of (rows_inserted, errors)
         """
-        import json
-        import io
-
         table_id = self.get_table_id(table_name)
 
         # Convert rows to newline-delimited JSON
-        json_data = "\n".join(json.dumps(row) for row in rows)
-        json_bytes = json_data.encode("utf-8")
-        json_file = io.BytesIO(json_bytes)
+        json_file, rows_attempted = ndjson_buffer(rows)
 
         # Configure load job
         # Don't pass schema - let BigQuery use the existing table's schema.
@@ -350,7 +345,7 @@ class BigQueryLoader:
                 job_id=load_job.job_id,
             )
 
-            return load_job.output_rows or len(rows), []
+            return load_job.output_rows or rows_attempted, []
 
         except BadRequest as e:
             error_msg = str(e)
@@ -362,7 +357,7 @@ class BigQueryLoader:
                     f"Fix: drop the table (bq rm -f -t {table_id}) and let v2 recreate it.",
                     failure_reason="SCHEMA_MISMATCH",
                     table=table_name,
-                    rows_attempted=len(rows),
+                    rows_attempted=rows_attempted,
                 )
             else:
                 logger.error(
@@ -370,7 +365,7 @@ class BigQueryLoader:
                     f"Error: {error_msg}.",
                     failure_reason="LOAD_JOB_BAD_REQUEST",
                     table=table_name,
-                    rows_attempted=len(rows),
+                    rows_attempted=rows_attempted,
                 )
             return 0, [error_msg]
 
@@ -382,30 +377,71 @@ class BigQueryLoader:
                 f"This could be a permissions issue, network timeout, or BigQuery service error.",
                 failure_reason="LOAD_JOB_FAILED",
                 table=table_name,
-                rows_attempted=len(rows),
+                rows_attempted=rows_attempted,
                 error_detail=error_msg,
             )
             return 0, [error_msg]
 
-    def delete_brand_data(
+    def create_stage_table(
         self,
-        brand_code: str,
         table_name: str,
+        import_id: str,
+        schema: List[bigquery.SchemaField],
+    ) -> str:
+        """
+        Create an empty staging table for a snapshot upload.
+
+        Returns:
+            Staging table name (same dataset as the target)
+        """
+        stage_name = f"{table_name}__stage_{re.sub(r'[^A-Za-z0-9_]', '_', import_id)}"
+
+        table = bigquery.Table(self.get_table_id(stage_name), schema=schema)
+        table.expires = datetime.now(timezone.utc) + STAGE_TABLE_TTL
+        self.client.create_table(table, exists_ok=True)
+
+        return stage_name
+
+    def drop_stage_table(self, stage_name: str) -> None:
+        """Drop a staging table (not fatal if it fails - it expires anyway)."""
+        try:
+            self.client.delete_table(self.get_table_id(stage_name), not_found_ok=True)
+        except Exception as e:
+            logger.warning(f"Failed to drop staging table {stage_name}: {e}")
+
+    def merge_stage_into(
+        self,
+        table_name: str,
+        stage_name: str,
+        brand_code: str,
+        schema: List[bigquery.SchemaField],
         max_retries: int = 5,
-    ) -> int:
+    ) -> List[str]:
         """
-        Delete all rows for a specific brand from a table.
+        Replace a brand's rows in a table with the staged rows in one MERGE.
 
-        Used for BA Produk categories which are daily snapshots.
+        Deleting the brand's existing rows and inserting the staged ones is a
+        single DML statement, so readers never see the brand half-replaced and
+        only one DML slot is taken per snapshot upload.
         Note: Does NOT delete the header row (_brand_code = "_header_").
 
         Includes retry logic with exponential backoff for concurrent DML rate limits.
+
+        Returns:
+            List of errors (empty on success)
         """
         table_id = self.get_table_id(table_name)
+        stage_id = self.get_table_id(stage_name)
+        columns = ", ".join(field.name for field in schema)
 
+        # ON FALSE: no row ever matches, so every target row for the brand is
+        # "not matched by source" (deleted) and every staged row is inserted
         query = f"""
-        DELETE FROM `{table_id}`
-        WHERE _brand_code = @brand_code
+        MERGE `{table_id}` T
+        USING `{stage_id}` S
+        ON FALSE
+        WHEN NOT MATCHED BY SOURCE AND T._brand_code = @brand_code THEN DELETE
+        WHEN NOT MATCHED THEN INSERT ({columns}) VALUES ({columns})
         """
 
         job_config = bigquery.QueryJobConfig(
@@ -420,42 +456,60 @@ class BigQueryLoader:
                 query_job = self.client.query(query, job_config=job_config)
                 query_job.result()
 
-                rows_deleted = query_job.num_dml_affected_rows
                 logger.info(
-                    f"Deleted {rows_deleted} rows for brand {brand_code} from {table_name}",
+                    f"Merged staged rows for brand {brand_code} into {table_name}",
                     brand_code=brand_code,
                     table=table_name,
+                    rows_affected=query_job.num_dml_affected_rows,
                 )
-                return rows_deleted
-
-            except NotFound:
-                logger.debug(f"Table {table_name} not found, nothing to delete")
-                return 0
+                return []
 
-            except BadRequest as e:
+            except (BadRequest, TooManyRequests) as e:
                 # Check if it's a concurrent DML rate limit error
                 error_msg = str(e)
-                if "Too many DML statements" in error_msg or "concurrent" in error_msg.lower():
+                if (
+                    isinstance(e, TooManyRequests)
+                    or "Too many DML statements" in error_msg
+                    or "concurrent" in error_msg.lower()
+                ):
                     last_error = e
-                    # Exponential backoff with jitter: 2^attempt + random(0-1) seconds
-                    wait_time = (2 ** attempt) + random.random()
+                    # Server's Retry-After, else exponential backoff with jitter
+                    wait_time = _retry_wait(attempt, e)
                     logger.warning(
                         f"Concurrent DML rate limit hit, retrying in {wait_time:.1f}s "
                         f"(attempt {attempt + 1}/{max_retries})"
                     )
                     time.sleep(wait_time)
                     continue
-                else:
-                    logger.warning(f"Failed to delete brand data: {e}")
-                    return 0
+                logger.error(
+                    f"BIGQUERY ERROR: Snapshot MERGE failed for table '{table_name}'. "
+                    f"Error: {error_msg}.",
+                    failure_reason="SNAPSHOT_MERGE_FAILED",
+                    table=table_name,
+                    brand=brand_code,
+                )
+                return [error_msg]
 
             except Exception as e:
-                logger.warning(f"Failed to delete brand data: {e}")
-                return 0
+                error_msg = str(e)
+                logger.error(
+                    f"BIGQUERY ERROR: Snapshot MERGE failed for table '{table_name}'. "
+                    f"Error: {error_msg}.",
+                    failure_reason="SNAPSHOT_MERGE_FAILED",
+                    table=table_name,
+                    brand=brand_code,
+                )
+                return [error_msg]
 
         # All retries exhausted
-        logger.error(f"Failed to delete brand data after {max_retries} retries: {last_error}")
-        return 0
+        logger.error(
+            f"BIGQUERY ERROR: Snapshot MERGE failed after {max_retries} retries "
+            f"for table '{table_name}': {last_error}",
+            failure_reason="SNAPSHOT_MERGE_FAILED",
+            table=table_name,
+            brand=brand_code,
+        )
+        return [str(last_error)]
 
     def delete_all_data(self, table_name: str) -> int:
         """
@@ -514,6 +568,42 @@ class BigQueryLoader:
 
         return False
 
+    def has_header_row(self, table: bigquery.Table) -> bool:
+        """
+        Check if the header row exists, using the table's labels.
+
+        Only tables without the header label (new, or created before the
+        label existed) fall back to the header_row_exists query; the label is
+        then set so later uploads skip the query.
+        """
+        table_name = table.table_id
+        if table_name in self._header_tables:
+            return True
+
+        if (table.labels or {}).get(HEADER_LABEL) == "true":
+            self._header_tables.add(table_name)
+            return True
+
+        if self.header_row_exists(table_name):
+            self.mark_header_inserted(table)
+            return True
+
+        return False
+
+    def mark_header_inserted(self, table: bigquery.Table) -> None:
+        """Record on the table (label) and in-process that the header row exists."""
+        self._header_tables.add(table.table_id)
+
+        try:
+            table.labels = {**(table.labels or {}), HEADER_LABEL: "true"}
+            table = self.client.update_table(table, ["labels"])
+            if table.table_id in self._tables:
+                # Keep the cached copy's etag current
+                self._tables[table.table_id] = table
+        except Exception as e:
+            # Not fatal - the next process falls back to the header query
+            logger.warning(f"Failed to set header label on {table.table_id}: {e}")
+
     def upload(
         self,
         parsed_file: ParsedFile,
@@ -552,58 +642,68 @@ class BigQueryLoader:
             schema = self.get_schema(len(parsed_file.headers))
 
             # Ensure table exists
-            self.ensure_table_exists(category.bigquery_table, schema)
+            table = self.ensure_table_exists(category.bigquery_table, schema)
 
-            # These categories are snapshots - DELETE existing brand data first
+            # These categories are snapshots - the brand's existing rows are replaced
             # BA Dash is historical (append-only), so it's NOT in this list
             snapshot_categories = ["BA Produk", "Informasi", "Export SKU", "Demografis", "Proyeksi"]
             is_snapshot = any(cat in category.name for cat in snapshot_categories)
 
-            if is_snapshot:
-                deleted = self.delete_brand_data(brand_code, category.bigquery_table)
-                logger.info(f"Deleted {deleted} existing rows for {brand_code} before import")
-
-            # Prepare rows
-            header_row, data_rows = self.prepare_rows(parsed_file, brand_code, import_id)
-
-            # Check if we need to insert header row
-            rows_to_insert = []
-            if not self.header_row_exists(category.bigquery_table):
-                rows_to_insert.append(header_row)
+            # Check if we need to insert header row (label lookup, no query)
+            include_header = not self.has_header_row(table)
+            if include_header:
                 logger.info("Inserting header row")
 
-            rows_to_insert.extend(data_rows)
-
-            # Choose insert method based on category type
-            # - Snapshot categories: Use load jobs (writes to table storage, not buffer)
-            #   This fixes the duplicate issue where DELETE can't see streaming buffer data
-            # - Append-only categories: Use streaming insert (faster for real-time)
+            # Snapshot categories load into a staging table first; a single
+            # MERGE then swaps the brand's rows (no DELETE-then-insert window)
+            load_table = category.bigquery_table
             if is_snapshot:
+                load_table = self.create_stage_table(category.bigquery_table, import_id, schema)
                 logger.info(
-                    f"Using load job for snapshot category (avoids streaming buffer)",
+                    f"Using staging table + MERGE for snapshot category",
                     category=category.name,
+                    stage_table=load_table,
                 )
-                rows_inserted, errors = self.load_job_insert(
-                    category.bigquery_table,
-                    rows_to_insert,
-                    schema,
-                )
-            else:
-                rows_inserted, errors = self.streaming_insert(
-                    category.bigquery_table,
-                    rows_to_insert,
-                    batch_size=settings.BATCH_SIZE,
-                )
+
+            try:
+                # Rows are generated one at a time and serialized straight
+                # into the NDJSON buffer; no list of prepared row dicts is built
+                rows_to_insert = self.iter_rows(parsed_file, brand_code, include_header)
+                rows_total = len(parsed_file.rows) + int(include_header)
+
+                # Snapshot categories load into the staging table (merged
+                # below); append-only categories load straight into theirs
+                rows_inserted, errors = self.load_job_insert(load_table, rows_to_insert)
+
+                if is_snapshot and not errors:
+                    errors = self.merge_stage_into(
+                        category.bigquery_table,
+                        load_table,
+                        brand_code,
+                        schema,
+                    )
+                    if errors:
+                        rows_inserted = 0
+
+            finally:
+                if is_snapshot:
+                    self.drop_stage_table(load_table)
+
+            if errors:
+                self.forget_table(category.bigquery_table)
+            elif include_header:
+                self.mark_header_inserted(table)
 
             return len(errors) == 0, {
                 "import_id": import_id,
                 "table": category.bigquery_table,
                 "rows_inserted": rows_inserted,
-                "rows_total": len(rows_to_insert),
+                "rows_total": rows_total,
                 "errors": errors,
             }
 
         except Exception as e:
+            self.forget_table(category.bigquery_table)
             error_msg = str(e)
             logger.error(
                 f"BIGQUERY ERROR: Upload pipeline failed for table '{category.bigquery_table}'. "
@@ -660,44 +760,45 @@ class BigQueryLoader:
             # Ensure dataset and table exist
             self.ensure_dataset_exists()
             schema = self.get_schema(len(headers))
-            self.ensure_table_exists(category.bigquery_table, schema)
+            table = self.ensure_table_exists(category.bigquery_table, schema)
 
             # Prepare rows with Excel-style column names
-            prepared_rows = []
+            columns = list(zip(column_names(len(headers)), headers))
 
             # Add header row if needed
-            if not self.header_row_exists(category.bigquery_table):
-                header_row = {"_brand_code": "_header_"}
-                for i, header in enumerate(headers):
-                    col_name = get_column_name(i)
-                    header_row[col_name] = str(header) if header else ""
-                prepared_rows.append(header_row)
+            include_header = not self.has_header_row(table)
+            header_rows = []
+            if include_header:
+                header_rows.append(_header_row(columns))
                 logger.info("Including header row in batch")
 
-            # Convert data rows to Excel-style columns
-            for row in rows:
-                prepared_row = {"_brand_code": row.get("_brand_code", "")}
-                for i, header in enumerate(headers):
-                    col_name = get_column_name(i)
-                    value = row.get(header, "")
-                    prepared_row[col_name] = str(value) if value is not None else ""
-                prepared_rows.append(prepared_row)
+            # Convert data rows to Excel-style columns lazily; they are
+            # serialized one at a time by load_job_insert
+            prepared_rows = itertools.chain(
+                header_rows,
+                (_data_row(row, columns, row.get("_brand_code", "")) for row in rows),
+            )
 
             # Insert using load job
             rows_inserted, errors = self.load_job_insert(
                 category.bigquery_table,
                 prepared_rows,
-                schema,
             )
 
+            if errors:
+                self.forget_table(category.bigquery_table)
+            elif include_header:
+                self.mark_header_inserted(table)
+
             return len(errors) == 0, {
                 "table": category.bigquery_table,
                 "rows_inserted": rows_inserted,
-                "rows_total": len(prepared_rows),
+                "rows_total": len(rows) + int(include_header),
                 "errors": errors,
             }
 
         except Exception as e:
+            self.forget_table(category.bigquery_table)
             error_msg = str(e)
             logger.error(
                 f"BIGQUERY ERROR: Batch upload pipeline failed for table '{category.bigquery_table}'. "
@@ -715,11 +816,14 @@ class BigQueryLoader:
 
 # Module-level convenience instance
 _loader: Optional[BigQueryLoader] = None
+_loader_lock = threading.Lock()
 
 
 def get_loader() -> BigQueryLoader:
-    """Get or create the BigQuery loader instance."""
+    """Get or create the BigQuery loader instance (thread-safe)."""
     global _loader
     if _loader is None:
-        _loader = BigQueryLoader()
+        with _loader_lock:
+            if _loader is None:
+                _loader = BigQueryLoader()
     return _loader
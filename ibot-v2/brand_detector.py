@@ -9,8 +9,10 @@ Final version will use brand codes in filenames provided by agents.
 """
 
 import os
-from typing import Dict, Optional
-from collections import Counter
+import threading
+from collections import defaultdict
+from operator import itemgetter
+from typing import Dict, List, Optional, Set, Tuple
 
 from google.cloud import bigquery
 from google.cloud.exceptions import NotFound
@@ -30,20 +32,164 @@ CONFIG_DATASET = "admin_config"
 _validation_cache: Dict[str, Dict[str, str]] = {}
 _bq_client = None
 
+# Guards client creation, so concurrent requests in one process don't
+# create two clients
+_bq_client_lock = threading.Lock()
+# Per-category locks for cache misses: concurrent requests don't query (or
+# sync) the same category twice, while other categories load in parallel
+_validation_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+_validation_locks_lock = threading.Lock()
+
+# Set once this process has warmed the cache for every validation category
+# (on its first cache miss), so a burst of uploads shares one query
+_validation_warmed = False
+_validation_warm_lock = threading.Lock()
+
 
 def _get_bq_client() -> bigquery.Client:
-    """Get BigQuery client."""
+    """Get BigQuery client (created once per process)."""
     global _bq_client
     if _bq_client is None:
-        _bq_client = bigquery.Client(project=PROJECT_ID)
+        with _bq_client_lock:
+            if _bq_client is None:
+                _bq_client = bigquery.Client(project=PROJECT_ID)
     return _bq_client
 
 
+def _validation_lock(category_name: str) -> threading.Lock:
+    """Get the lock guarding a category's validation cache miss."""
+    with _validation_locks_lock:
+        return _validation_locks[category_name]
+
+
 def _get_validation_table_name(category_name: str) -> str:
     """Convert category name to validation table name."""
     return category_name.lower().replace(" ", "_") + "_validation"
 
 
+def _shop_names_cache_key(category_name: str) -> str:
+    """Cache key for a category's shop name -> brand code mapping."""
+    return f"{category_name}_shop_names"
+
+
+def _query_validation_tables(
+    category_names: List[str],
+) -> Tuple[Dict[str, Dict[str, str]], Dict[str, Dict[str, str]]]:
+    """
+    Read the validation tables of several categories in one query.
+
+    Both mappings come from the same rows, so they are built together:
+    - product mapping: Column B (product ID) -> Column A (brand/folder),
+      skipping the "Brand"/"Folder" header row
+    - shop name mapping: Column C (shop name) -> Column B (brand code)
+
+    Raises NotFound if any of the tables doesn't exist.
+
+    Returns:
+        Tuple of ({category: product mapping}, {category: shop name mapping})
+    """
+    client = _get_bq_client()
+
+    selects = []
+    params = []
+    for i, category_name in enumerate(category_names):
+        table_id = f"{PROJECT_ID}.{CONFIG_DATASET}.{_get_validation_table_name(category_name)}"
+        selects.append(f"SELECT @category_{i} AS category, A, B, C FROM `{table_id}`")
+        params.append(bigquery.ScalarQueryParameter(f"category_{i}", "STRING", category_name))
+
+    query = f"""
+    SELECT category, A, B, C
+    FROM ({" UNION ALL ".join(selects)})
+    WHERE B IS NOT NULL AND TRIM(B) != ''
+    """
+
+    rows = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=params)).result()
+
+    products: Dict[str, Dict[str, str]] = {name: {} for name in category_names}
+    shop_names: Dict[str, Dict[str, str]] = {name: {} for name in category_names}
+    for row in rows:
+        code = str(row.B).strip()
+        if not code:
+            continue
+
+        if row.A is not None and row.A not in ("Brand", "Folder"):
+            brand = str(row.A).strip()
+            if brand:
+                products[row.category][code] = brand
+
+        shop_name = str(row.C).strip() if row.C else ""
+        if shop_name:
+            shop_names[row.category][shop_name] = code
+
+    return products, shop_names
+
+
+def _existing_validation_tables() -> Set[str]:
+    """Names of the tables in the config dataset."""
+    client = _get_bq_client()
+    return {t.table_id for t in client.list_tables(f"{PROJECT_ID}.{CONFIG_DATASET}")}
+
+
+def warm_validation_cache(category_names: List[str]) -> int:
+    """
+    Load the brand validation data of several categories in one query.
+
+    Replaces one query per category (and a second one for shop names) with
+    a single UNION ALL over the validation tables. A missing table fails the
+    whole query, so it is retried with only the tables that exist. Categories
+    with no table or no product mappings are left uncached so
+    load_brand_validation still syncs them from Sheets on demand.
+
+    Returns:
+        Number of categories cached (0 if the query failed)
+    """
+    if not category_names:
+        return 0
+
+    try:
+        try:
+            products, shop_names = _query_validation_tables(category_names)
+        except NotFound:
+            existing = _existing_validation_tables()
+            missing = [c for c in category_names if _get_validation_table_name(c) not in existing]
+            logger.info(
+                f"Validation tables missing for {len(missing)} categories, warming the rest",
+                missing=missing,
+            )
+            category_names = [c for c in category_names if c not in missing]
+            if not category_names:
+                return 0
+            products, shop_names = _query_validation_tables(category_names)
+    except Exception as e:
+        logger.warning(f"Failed to warm validation cache for {len(category_names)} categories: {e}")
+        return 0
+
+    cached = 0
+    for category_name in category_names:
+        _validation_cache[_shop_names_cache_key(category_name)] = shop_names[category_name]
+        if products[category_name]:
+            _validation_cache[category_name] = products[category_name]
+            cached += 1
+
+    logger.info(f"Warmed validation cache for {cached}/{len(category_names)} categories")
+    return cached
+
+
+def _warm_validation_cache_once() -> None:
+    """Warm the cache for every validation category, once per process."""
+    global _validation_warmed
+    if _validation_warmed:
+        return
+
+    with _validation_warm_lock:
+        if _validation_warmed:
+            return
+        from admin_sync import VALIDATION_SHEETS
+        warm_validation_cache(VALIDATION_SHEETS)
+        # Not retried on failure: misses fall back to per-category loads
+        _validation_warmed = True
+
+
 def load_brand_validation(category_name: str) -> Dict[str, str]:
     """
     Load brand validation mapping from BigQuery.
@@ -61,29 +207,28 @@ def load_brand_validation(category_name: str) -> Dict[str, str]:
     if category_name in _validation_cache:
         return _validation_cache[category_name]
 
-    client = _get_bq_client()
+    # First miss in this process: load every category in one query
+    _warm_validation_cache_once()
+    if category_name in _validation_cache:
+        return _validation_cache[category_name]
+
+    with _validation_lock(category_name):
+        # Another thread may have loaded it while we waited
+        if category_name in _validation_cache:
+            return _validation_cache[category_name]
+        return _load_brand_validation(category_name)
+
+
+def _load_brand_validation(category_name: str) -> Dict[str, str]:
+    """Query (or sync, then query) a category's validation data and cache it."""
     table_name = _get_validation_table_name(category_name)
     table_id = f"{PROJECT_ID}.{CONFIG_DATASET}.{table_name}"
 
     def _query_validation() -> Dict[str, str]:
-        """Query validation data from BigQuery."""
-        query = f"""
-        SELECT A as brand, B as product_id
-        FROM `{table_id}`
-        WHERE A != 'Brand' AND A != 'Folder' AND A IS NOT NULL
-          AND B IS NOT NULL AND TRIM(B) != ''
-        """
-
-        rows = client.query(query).result()
-
-        mapping = {}
-        for row in rows:
-            brand = str(row.brand).strip() if row.brand else ""
-            product_id = str(row.product_id).strip() if row.product_id else ""
-            if product_id and brand:
-                mapping[product_id] = brand
-
-        return mapping
+        """Query validation data from BigQuery (shop names are cached too)."""
+        products, shop_names = _query_validation_tables([category_name])
+        _validation_cache[_shop_names_cache_key(category_name)] = shop_names[category_name]
+        return products[category_name]
 
     try:
         mapping = _query_validation()
@@ -136,39 +281,31 @@ def _load_shop_name_mapping(category_name: str) -> Dict[str, str]:
     Used for BA Dash SHO where Column C contains Shopee shop names
     and Column B contains the corresponding brand codes.
     """
-    cache_key = f"{category_name}_shop_names"
+    cache_key = _shop_names_cache_key(category_name)
     if cache_key in _validation_cache:
         return _validation_cache[cache_key]
 
-    client = _get_bq_client()
-    table_name = _get_validation_table_name(category_name)
-    table_id = f"{PROJECT_ID}.{CONFIG_DATASET}.{table_name}"
+    _warm_validation_cache_once()
+    if cache_key in _validation_cache:
+        return _validation_cache[cache_key]
+
+    # Queried on its own: no Sheets sync, and independent of whether the
+    # product mapping loaded
+    with _validation_lock(cache_key):
+        if cache_key in _validation_cache:
+            return _validation_cache[cache_key]
+
+        try:
+            _, shop_names = _query_validation_tables([category_name])
+            mapping = shop_names[category_name]
+            logger.info(f"Loaded {len(mapping)} shop name mappings for {category_name}")
+        except Exception as e:
+            logger.warning(f"Failed to load shop name mapping for {category_name}: {e}")
+            mapping = {}
 
-    try:
-        query = f"""
-        SELECT B as brand_code, C as shop_name
-        FROM `{table_id}`
-        WHERE C IS NOT NULL AND TRIM(C) != ''
-          AND B IS NOT NULL AND TRIM(B) != ''
-        """
-        rows = client.query(query).result()
-
-        mapping = {}
-        for row in rows:
-            brand_code = str(row.brand_code).strip() if row.brand_code else ""
-            shop_name = str(row.shop_name).strip() if row.shop_name else ""
-            if shop_name and brand_code:
-                mapping[shop_name] = brand_code
-
-        logger.info(f"Loaded {len(mapping)} shop name mappings for {category_name}")
         _validation_cache[cache_key] = mapping
         return mapping
 
-    except Exception as e:
-        logger.warning(f"Failed to load shop name mapping for {category_name}: {e}")
-        _validation_cache[cache_key] = {}
-        return {}
-
 
 def detect_brand_from_filename(filename: str, category_name: str) -> Optional[str]:
     """
@@ -248,28 +385,25 @@ def detect_brand_from_data(
     first_col = parsed_file.headers[0]
 
     # Collect product codes from first N rows
-    values_to_check = []
-    for row in parsed_file.rows[:num_rows_to_check]:
-        value = row.get(first_col, "")
-        if value:
-            # Convert to string and normalize - floats from Excel have ".0" suffix
-            value_str = str(value).strip()
-            if value_str.endswith(".0"):
-                value_str = value_str[:-2]
-            if value_str:
-                values_to_check.append(value_str)
+    # Convert to string and normalize - floats from Excel have ".0" suffix
+    values_to_check = [
+        value_str
+        for row in parsed_file.rows[:num_rows_to_check]
+        if (value := row.get(first_col))
+        if (value_str := str(value).strip().removesuffix(".0"))
+    ]
 
     if not values_to_check:
         return None
 
-    # Match against validation and count by brand
-    brand_counts = Counter()
+    # Match against validation and count by brand (one dict probe per value)
+    brand_counts: Dict[str, int] = {}
     match_count = 0
 
     for value in values_to_check:
-        if value in validation_map:
-            brand = validation_map[value]
-            brand_counts[brand] += 1
+        brand = validation_map.get(value)
+        if brand is not None:
+            brand_counts[brand] = brand_counts.get(brand, 0) + 1
             match_count += 1
 
     # Check if we have enough matches
@@ -295,7 +429,8 @@ def detect_brand_from_data(
         return None
 
     # Return brand with most matches
-    brand, count = brand_counts.most_common(1)[0]
+    # First brand to reach the top count wins, as with Counter.most_common
+    brand, count = max(brand_counts.items(), key=itemgetter(1))
     logger.info(
         f"Detected brand '{brand}' from product codes "
         f"({count}/{match_count} matches, {len(values_to_check)} checked)"
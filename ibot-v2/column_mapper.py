@@ -12,14 +12,48 @@ This enables v2 to handle files with different column orders,
 matching v1's flexibility.
 """
 
+import bisect
+import functools
 import re
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
 
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Dynamic header patterns, unioned so each header is scanned once. The group
+# that matched (m.lastgroup) names the kind, and holds the variation number:
+# - Indonesian: "Nama Variasi X", "Foto Variasi X"
+# - English: "Option X Name", "Option X Image"
+_DYNAMIC_HEADER_RE = re.compile(
+    r"nama\s*variasi\s*(?P<nama>\d+)"
+    r"|foto\s*variasi\s*(?P<foto>\d+)"
+    r"|option\s*(?P<option_name>\d+)\s*name"
+    r"|option\s*(?P<option_image>\d+)\s*image"
+)
+_DYNAMIC_NAME_GROUPS = frozenset(("nama", "option_name"))
+# Only the start of a header is scanned for a variation pattern; real
+# headers are well under this, so it just bounds the regex on junk cells
+# promoted to the header row
+_DYNAMIC_HEADER_MAX_SCAN = 128
+
+# Categories whose files carry dynamic (variation/media) headers, matched
+# as substrings of the category name
+_DYNAMIC_HEADER_CATEGORIES = ("BA Produk", "Informasi Media")
+
+# Files with at least this many rows are mapped with a row function generated
+# for their mapping plan. Compiling it costs about as much as mapping 100-200
+# rows and saves ~20% per row, so it only pays off on larger files.
+_CODEGEN_MIN_ROWS = 1000
+
+# Finite numbers float() accepts, checked on a SUM_STARTS_WITH text cell
+# after its Indonesian separators are converted ("1.234,5" -> "1234.5"), so
+# exactly the cells float() used to parse are summed, without the exception
+_SUM_NUMBER_RE = re.compile(
+    r"[-+]?(?:\d(?:_?\d)*(?:\.(?:\d(?:_?\d)*)?)?|\.\d(?:_?\d)*)(?:[eE][-+]?\d(?:_?\d)*)?"
+)
+
 
 @dataclass
 class ColumnRule:
@@ -27,6 +61,11 @@ class ColumnRule:
     standard_column: str
     action: str  # COALESCE_EXACT, COALESCE_STARTS_WITH, SUM_STARTS_WITH
     replacements: List[str] = field(default_factory=list)
+    # Normalized replacements, computed once instead of on every match/row
+    keys: List[str] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.keys = [normalize_header(r) for r in self.replacements]
 
 
 def normalize_header(header: str) -> str:
@@ -74,10 +113,9 @@ def detect_dynamic_headers(headers: List[str]) -> List[str]:
     Returns headers sorted in interleaved order:
     Foto Panduan Ukuran, Name 1, Image 1, Name 2, Image 2, ...
     """
-    dynamic_headers = []
-    name_headers = []  # (number, header)
-    image_headers = []  # (number, header)
     special_headers = []
+    # Variation number -> [name header, image header] (last one wins)
+    variations: Dict[int, List[Optional[str]]] = {}
 
     for header in headers:
         header_lower = normalize_header(header)
@@ -87,106 +125,158 @@ def detect_dynamic_headers(headers: List[str]) -> List[str]:
             special_headers.append(header)
             continue
 
-        # Indonesian patterns: "Nama Variasi X", "Foto Variasi X"
-        nama_match = re.search(r'nama\s*variasi\s*(\d+)', header_lower)
-        foto_match = re.search(r'foto\s*variasi\s*(\d+)', header_lower)
-
-        # English patterns: "Option X Name", "Option X Image"
-        option_name_match = re.search(r'option\s*(\d+)\s*name', header_lower)
-        option_image_match = re.search(r'option\s*(\d+)\s*image', header_lower)
-
-        if nama_match:
-            name_headers.append((int(nama_match.group(1)), header))
-        elif foto_match:
-            image_headers.append((int(foto_match.group(1)), header))
-        elif option_name_match:
-            name_headers.append((int(option_name_match.group(1)), header))
-        elif option_image_match:
-            image_headers.append((int(option_image_match.group(1)), header))
+        # Substring screen: every variation pattern contains one of these
+        # words, so most headers ("SKU", "Harga", ...) skip the regex
+        if "variasi" not in header_lower and "option" not in header_lower:
+            continue
 
-    # Sort by number
-    name_headers.sort(key=lambda x: x[0])
-    image_headers.sort(key=lambda x: x[0])
+        # Name/image variation patterns, one regex pass. search() rather
+        # than match(): exports may prefix the pattern ("Produk - Nama Variasi 1")
+        match = _DYNAMIC_HEADER_RE.search(header_lower[:_DYNAMIC_HEADER_MAX_SCAN])
+        if match:
+            kind = match.lastgroup
+            slot = variations.setdefault(int(match.group(kind)), [None, None])
+            slot[0 if kind in _DYNAMIC_NAME_GROUPS else 1] = header
 
     # Build interleaved list: special first, then name/image pairs
-    dynamic_headers.extend(special_headers)
+    dynamic_headers = special_headers
 
-    # Interleave names and images (max 15 pairs like v1)
+    # Interleave names and images (max 15 pairs like v1: the lowest numbers)
     max_pairs = 15
-    name_dict = {num: hdr for num, hdr in name_headers}
-    image_dict = {num: hdr for num, hdr in image_headers}
+    for num in sorted(variations)[:max_pairs]:
+        name_header, image_header = variations[num]
+        if name_header is not None:
+            dynamic_headers.append(name_header)
+        if image_header is not None:
+            dynamic_headers.append(image_header)
 
-    all_numbers = sorted(set(name_dict.keys()) | set(image_dict.keys()))[:max_pairs]
+    return dynamic_headers
 
-    for num in all_numbers:
-        if num in name_dict:
-            dynamic_headers.append(name_dict[num])
-        if num in image_dict:
-            dynamic_headers.append(image_dict[num])
 
-    return dynamic_headers
+def claim_column(
+    source_header_map: Dict[str, List[int]],
+    claimed: Dict[str, int],
+    key: str,
+) -> Optional[int]:
+    """
+    Claim the next unclaimed column for a header key (first-come-first-serve).
+
+    Args:
+        source_header_map: Original header map
+        claimed: Number of columns claimed so far per key (modified in place)
+        key: Normalized header name
+
+    Returns:
+        Column index if one is left, None otherwise
+    """
+    indices = source_header_map.get(key)
+    if indices:
+        count = claimed.get(key, 0)
+        if count < len(indices):
+            claimed[key] = count + 1
+            return indices[count]
+    return None
 
 
 def apply_coalesce_exact(
     source_header_map: Dict[str, List[int]],
-    working_map: Dict[str, List[int]],
-    replacements: List[str],
+    claimed: Dict[str, int],
+    keys: List[str],
 ) -> Optional[int]:
     """
     Apply COALESCE_EXACT rule: try each replacement in order, use first that exists.
 
     Args:
         source_header_map: Original header map (for checking existence)
-        working_map: Working map (for claiming columns, modified in place)
-        replacements: List of alternative header names to try
+        claimed: Columns claimed so far per key (modified in place)
+        keys: Normalized alternative header names to try (ColumnRule.keys)
 
     Returns:
         Column index if found, None otherwise
     """
-    for replacement in replacements:
-        key = normalize_header(replacement)
-        if key in working_map and working_map[key]:
-            # Claim this column (first-come-first-serve)
-            return working_map[key].pop(0)
+    for key in keys:
+        idx = claim_column(source_header_map, claimed, key)
+        if idx is not None:
+            return idx
     return None
 
 
 def apply_coalesce_starts_with(
     source_header_map: Dict[str, List[int]],
-    working_map: Dict[str, List[int]],
+    claimed: Dict[str, int],
     patterns: List[str],
+    sorted_keys: Optional[List[str]] = None,
 ) -> Optional[int]:
     """
     Apply COALESCE_STARTS_WITH rule: find first header starting with pattern.
 
+    Keys starting with a pattern are a contiguous run of the sorted keys, found
+    with bisect instead of testing every key. Among them the header that comes
+    first in the source file wins (lowest first column index).
+
     Args:
         source_header_map: Original header map
-        working_map: Working map (modified in place)
-        patterns: List of prefix patterns to try
+        claimed: Columns claimed so far per key (modified in place)
+        patterns: Normalized prefix patterns to try (ColumnRule.keys)
+        sorted_keys: sorted(source_header_map), built once per file
 
     Returns:
         Column index if found, None otherwise
     """
-    for pattern in patterns:
-        pattern_lower = normalize_header(pattern)
-        for key in list(working_map.keys()):
-            if key.startswith(pattern_lower) and working_map[key]:
-                return working_map[key].pop(0)
+    if sorted_keys is None:
+        sorted_keys = sorted(source_header_map)
+
+    for pattern_lower in patterns:
+        best_key = None
+        for i in range(bisect.bisect_left(sorted_keys, pattern_lower), len(sorted_keys)):
+            key = sorted_keys[i]
+            if not key.startswith(pattern_lower):
+                break
+            indices = source_header_map[key]
+            if claimed.get(key, 0) < len(indices) and (
+                best_key is None or indices[0] < source_header_map[best_key][0]
+            ):
+                best_key = key
+        if best_key is not None:
+            return claim_column(source_header_map, claimed, best_key)
     return None
 
 
-def apply_sum_starts_with(
-    source_row: List[Any],
+def find_sum_columns(
     source_header_map: Dict[str, List[int]],
     patterns: List[str],
+) -> List[int]:
+    """
+    Resolve the columns a SUM_STARTS_WITH rule adds up (once per file).
+
+    A column matched by several patterns is listed (and summed) once per
+    pattern, in pattern order.
+
+    Args:
+        source_header_map: Header map
+        patterns: Normalized prefix patterns (ColumnRule.keys)
+
+    Returns:
+        Column indices to sum, in summing order
+    """
+    sum_indices = []
+    for pattern_lower in patterns:
+        for key, indices in source_header_map.items():
+            if key.startswith(pattern_lower):
+                sum_indices.extend(indices)
+    return sum_indices
+
+
+def apply_sum_starts_with(
+    source_row: List[Any],
+    sum_indices: List[int],
 ) -> str:
     """
     Apply SUM_STARTS_WITH rule: sum all columns matching pattern.
 
     Args:
         source_row: The data row
-        source_header_map: Header map
-        patterns: List of prefix patterns
+        sum_indices: Columns to sum, from find_sum_columns
 
     Returns:
         Sum as string, or empty string if no matches
@@ -194,24 +284,27 @@ def apply_sum_starts_with(
     total = 0
     found_any = False
 
-    for pattern in patterns:
-        pattern_lower = normalize_header(pattern)
-        for key, indices in source_header_map.items():
-            if key.startswith(pattern_lower):
-                for idx in indices:
-                    if idx < len(source_row):
-                        value = source_row[idx]
-                        if value is not None:
-                            try:
-                                # Handle Indonesian number format
-                                value_str = str(value).strip()
-                                if value_str and value_str not in ('-', 'N/A', '#N/A'):
-                                    # Remove thousand separators, handle decimal
-                                    value_str = value_str.replace('.', '').replace(',', '.')
-                                    total += float(value_str)
-                                    found_any = True
-                            except (ValueError, TypeError):
-                                pass
+    row_len = len(source_row)
+
+    for idx in sum_indices:
+        if idx < row_len:
+            value = source_row[idx]
+            if value is None or isinstance(value, bool):
+                continue
+
+            # Numeric cells (Excel) are added as-is
+            if isinstance(value, (int, float)):
+                total += value
+                found_any = True
+                continue
+
+            # Handle Indonesian number format: remove thousand separators,
+            # handle decimal. Anything else ("-", "N/A", text) is skipped
+            # without a failed float() call.
+            value_str = str(value).replace('.', '').replace(',', '.').strip()
+            if _SUM_NUMBER_RE.fullmatch(value_str):
+                total += float(value_str)
+                found_any = True
 
     if found_any:
         # Return as integer if whole number
@@ -232,7 +325,7 @@ class ColumnMapper:
 
     def __init__(
         self,
-        standard_headers: List[str],
+        standard_headers: Sequence[str],
         column_rules: Optional[List[ColumnRule]] = None,
         include_dynamic: bool = True,
     ):
@@ -248,6 +341,9 @@ class ColumnMapper:
         self.column_rules = column_rules or []
         self.include_dynamic = include_dynamic
 
+        # Normalized standard headers, computed once per mapper (not per file)
+        self._standard_keys: List[str] = [normalize_header(h) for h in standard_headers]
+
         # Build rules lookup by standard column name
         self.rules_by_column: Dict[str, ColumnRule] = {
             rule.standard_column: rule for rule in self.column_rules
@@ -257,7 +353,7 @@ class ColumnMapper:
         self,
         source_headers: List[str],
         source_rows: List[List[Any]],
-    ) -> Tuple[List[str], List[Dict[str, Any]]]:
+    ) -> Tuple[List[str], List[List[Any]]]:
         """
         Map source file data to standard column order.
 
@@ -268,8 +364,20 @@ class ColumnMapper:
         Returns:
             Tuple of (output_headers, output_rows)
             - output_headers: Standard headers in correct order
-            - output_rows: Data rows as dicts with standard header keys
+            - output_rows: Data rows as lists, aligned with output_headers
         """
+        # Fast path: file already has exactly the standard headers, in order
+        # (ignoring case/whitespace). Every header is then a direct match to
+        # its own column, and dynamic headers are all duplicates of standard
+        # ones, so rules and dynamic detection can't change the result.
+        if self._is_standard_layout(source_headers):
+            logger.info(
+                f"Column mapping: source headers already in standard order",
+                mapped=len(self.standard_headers),
+                total=len(self.standard_headers),
+            )
+            return list(self.standard_headers), self._copy_rows(source_rows)
+
         # Build source header map
         source_header_map = build_source_header_map(source_headers)
 
@@ -286,156 +394,231 @@ class ColumnMapper:
 
         # Build final output headers: standard + dynamic (excluding duplicates)
         output_headers = list(self.standard_headers)
-        standard_set = {normalize_header(h) for h in self.standard_headers}
+        standard_set: Set[str] = set(self._standard_keys)
 
         for dh in dynamic_headers:
-            if normalize_header(dh) not in standard_set:
+            dh_key = normalize_header(dh)
+            if dh_key not in standard_set:
                 output_headers.append(dh)
-                standard_set.add(normalize_header(dh))
+                standard_set.add(dh_key)
 
         # Pre-calculate column mapping for each output header
         # This is done once, then applied to all rows
-        column_mapping = self._calculate_mapping(
+        plan = self._calculate_mapping(
             output_headers,
             source_header_map,
         )
 
         # Log mapping results
-        mapped_count = sum(1 for m in column_mapping if m['source_idx'] is not None)
+        mapped_count = sum(1 for _, source_idx, _ in plan if source_idx is not None)
         logger.info(
             f"Column mapping: {mapped_count}/{len(output_headers)} headers mapped",
             mapped=mapped_count,
             total=len(output_headers),
         )
 
-        # Map each row
+        # Map each row. Large files get a row function generated for this
+        # plan; for small ones compiling it would cost more than it saves.
+        if len(source_rows) >= _CODEGEN_MIN_ROWS:
+            map_row = self._compile_row_mapper(plan)
+        else:
+            map_row = functools.partial(self._map_row, plan=plan)
+
         output_rows = []
         for source_row in source_rows:
-            output_row = self._map_row(
-                source_row,
-                output_headers,
-                column_mapping,
-                source_header_map,
-            )
-            output_rows.append(output_row)
+            output_rows.append(map_row(source_row))
 
         return output_headers, output_rows
 
+    def _is_standard_layout(self, source_headers: List[str]) -> bool:
+        """Check if source headers normalize to exactly the standard headers."""
+        if len(source_headers) != len(self._standard_keys):
+            return False
+        # Empty headers never match directly, so they can't take the fast path
+        return all(self._standard_keys) and self._standard_keys == [
+            normalize_header(h) for h in source_headers
+        ]
+
+    def _copy_rows(self, source_rows: List[List[Any]]) -> List[List[Any]]:
+        """
+        Copy rows that are already in standard layout.
+
+        Same values as _map_row with a direct match for every column:
+        None -> "", else stripped str; short rows padded with "".
+        """
+        num_columns = len(self.standard_headers)
+        output_rows = []
+
+        for source_row in source_rows:
+            output_row = [
+                "" if value is None else str(value).strip()
+                for value in source_row[:num_columns]
+            ]
+            if len(output_row) < num_columns:
+                output_row.extend([""] * (num_columns - len(output_row)))
+            output_rows.append(output_row)
+
+        return output_rows
+
     def _calculate_mapping(
         self,
         output_headers: List[str],
         source_header_map: Dict[str, List[int]],
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Tuple[str, Optional[int], Optional[List[int]]]]:
         """
         Pre-calculate column mapping for efficiency.
 
-        Returns list of mapping info for each output header:
+        Returns a flat plan with one (header, source_idx, sum_indices) tuple
+        per output header, so the row loop unpacks tuples instead of doing
+        dict lookups and rule dispatch per cell:
         - source_idx: Direct source column index (or None)
-        - rule: Special rule to apply (or None)
+        - sum_indices: Columns to add up (SUM_STARTS_WITH rules only, else None)
         """
-        # Create working copy of header map (for first-come-first-serve allocation)
-        working_map = {k: list(v) for k, v in source_header_map.items()}
+        # Columns claimed so far per key (first-come-first-serve allocation);
+        # a count per claimed key instead of a copy of every index list
+        claimed: Dict[str, int] = {}
+        # Prefix index for COALESCE_STARTS_WITH lookups
+        sorted_keys = sorted(source_header_map)
 
-        mappings = []
+        plan = []
 
         for header in output_headers:
-            mapping = {
-                'header': header,
-                'source_idx': None,
-                'rule': None,
-            }
+            sum_indices = None
 
             header_key = normalize_header(header)
 
             # Try direct match first
-            if header_key in working_map and working_map[header_key]:
-                mapping['source_idx'] = working_map[header_key].pop(0)
+            source_idx = claim_column(source_header_map, claimed, header_key)
 
             # If no direct match, check for special rule
-            elif header in self.rules_by_column:
+            if source_idx is None and header in self.rules_by_column:
                 rule = self.rules_by_column[header]
-                mapping['rule'] = rule
 
                 if rule.action == 'COALESCE_EXACT':
-                    idx = apply_coalesce_exact(
+                    source_idx = apply_coalesce_exact(
                         source_header_map,
-                        working_map,
-                        rule.replacements,
+                        claimed,
+                        rule.keys,
                     )
-                    mapping['source_idx'] = idx
 
                 elif rule.action == 'COALESCE_STARTS_WITH':
-                    idx = apply_coalesce_starts_with(
+                    source_idx = apply_coalesce_starts_with(
                         source_header_map,
-                        working_map,
-                        rule.replacements,
+                        claimed,
+                        rule.keys,
+                        sorted_keys,
                     )
-                    mapping['source_idx'] = idx
 
                 elif rule.action == 'COALESCE_COMBINED':
                     # Try starts_with matching first (more flexible)
                     # then fall back to exact matching
-                    idx = apply_coalesce_starts_with(
+                    source_idx = apply_coalesce_starts_with(
                         source_header_map,
-                        working_map,
-                        rule.replacements,
+                        claimed,
+                        rule.keys,
+                        sorted_keys,
                     )
-                    if idx is None:
-                        idx = apply_coalesce_exact(
+                    if source_idx is None:
+                        source_idx = apply_coalesce_exact(
                             source_header_map,
-                            working_map,
-                            rule.replacements,
+                            claimed,
+                            rule.keys,
                         )
-                    mapping['source_idx'] = idx
 
-                # SUM_STARTS_WITH is handled per-row, not pre-calculated
+                elif rule.action == 'SUM_STARTS_WITH':
+                    # Summed per row, over columns resolved once here
+                    sum_indices = find_sum_columns(
+                        source_header_map,
+                        rule.keys,
+                    )
 
-            mappings.append(mapping)
+            plan.append((header, source_idx, sum_indices))
 
-        return mappings
+        return plan
 
     def _map_row(
         self,
         source_row: List[Any],
-        output_headers: List[str],
-        column_mapping: List[Dict[str, Any]],
-        source_header_map: Dict[str, List[int]],
-    ) -> Dict[str, Any]:
-        """Map a single source row to output format."""
-        output_row = {}
+        plan: List[Tuple[str, Optional[int], Optional[List[int]]]],
+    ) -> List[Any]:
+        """
+        Map a single source row to output format.
 
-        for i, mapping in enumerate(column_mapping):
-            header = mapping['header']
-            source_idx = mapping['source_idx']
-            rule = mapping['rule']
+        Values are positional (aligned with the plan / output headers): no
+        per-row header keys to hash and store.
+        """
+        output_row = []
+        row_len = len(source_row)
 
+        for _, source_idx, sum_indices in plan:
             value = ""
 
             if source_idx is not None:
                 # Direct mapping
-                if source_idx < len(source_row):
+                if source_idx < row_len:
                     value = source_row[source_idx]
                     if value is None:
                         value = ""
                     else:
                         value = str(value).strip()
 
-            elif rule and rule.action == 'SUM_STARTS_WITH':
+            elif sum_indices is not None:
                 # Sum multiple columns
-                value = apply_sum_starts_with(
-                    source_row,
-                    source_header_map,
-                    rule.replacements,
-                )
+                value = apply_sum_starts_with(source_row, sum_indices)
 
-            output_row[header] = value
+            output_row.append(value)
 
         return output_row
 
+    def _compile_row_mapper(
+        self,
+        plan: List[Tuple[str, Optional[int], Optional[List[int]]]],
+    ) -> Callable[[List[Any]], List[Any]]:
+        """
+        Generate a row function specialized to a mapping plan.
+
+        Same values as _map_row, but the plan is unrolled once per file into
+        one expression per output column, with the source index hardcoded:
+            "" if (v := row[3]) is None else str(v).strip()   (direct)
+            _sum(row, _sum_5)                                   (SUM_STARTS_WITH)
+            ""                                                  (unmapped)
+        Only integer indices go into the generated source, never header text.
+        Rows too short for the highest direct index fall back to _map_row,
+        which pads the missing cells.
+        """
+        namespace: Dict[str, Any] = {
+            "_sum": apply_sum_starts_with,
+            "_map_row": self._map_row,
+            "_plan": plan,
+        }
+        cells = []
+        max_idx = -1
+
+        for i, (_, source_idx, sum_indices) in enumerate(plan):
+            if source_idx is not None:
+                cells.append(f'"" if (v := row[{source_idx}]) is None else str(v).strip()')
+                max_idx = max(max_idx, source_idx)
+            elif sum_indices is not None:
+                namespace[f"_sum_{i}"] = sum_indices
+                cells.append(f"_sum(row, _sum_{i})")
+            else:
+                cells.append('""')
+
+        source = (
+            "def map_row(row):\n"
+            f"    if len(row) <= {max_idx}:\n"
+            "        return _map_row(row, _plan)\n"
+            "    return [\n"
+            + "".join(f"        {cell},\n" for cell in cells)
+            + "    ]\n"
+        )
+        exec(compile(source, "<column_mapper>", "exec"), namespace)
+        return namespace["map_row"]
+
 
 def create_mapper_for_category(
     category_name: str,
-    standard_headers: List[str],
+    standard_headers: Sequence[str],
     column_aliases: Optional[Dict[str, List[str]]] = None,
 ) -> ColumnMapper:
     """
@@ -478,10 +661,7 @@ def create_mapper_for_category(
                 ))
 
     # Determine if this category should include dynamic headers
-    include_dynamic = any(cat in category_name for cat in [
-        "BA Produk",
-        "Informasi Media",
-    ])
+    include_dynamic = any(cat in category_name for cat in _DYNAMIC_HEADER_CATEGORIES)
 
     return ColumnMapper(
         standard_headers=standard_headers,
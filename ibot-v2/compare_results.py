@@ -8,11 +8,11 @@ Usage:
     python compare_results.py                      # Compare all tables
     python compare_results.py ba_produk_laz        # Compare specific table
     python compare_results.py ba_produk_laz GS     # Compare specific table and brand
-    python compare_results.py ba_produk_laz --latest  # Compare only latest import
 """
 
-import sys
-from typing import Optional
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
 from google.cloud import bigquery
 
 # Configuration
@@ -24,6 +24,17 @@ V2_DATASET = "ibot_v2_data"
 V1_BRAND_COL = "akun"
 V2_BRAND_COL = "_brand_code"
 
+# Columns left out of row comparisons: the brand columns everywhere, plus
+# per-load import bookkeeping in the detailed comparison
+BRAND_COLS = frozenset({V1_BRAND_COL, V2_BRAND_COL})
+DETAILED_EXCLUDED_COLS = BRAND_COLS | {"import_timestamp", "import_batch_id"}
+
+# v1-specific metadata columns, never treated as common
+V1_ONLY_METADATA = frozenset({"_import_id", "_source_file", "_import_timestamp", "_row_number"})
+
+# Tables compared concurrently (each comparison mostly waits on BigQuery)
+COMPARE_MAX_WORKERS = 8
+
 # Tables to compare (same names in both datasets)
 TABLES = [
     "ba_produk_laz",
@@ -48,49 +59,120 @@ def get_client() -> bigquery.Client:
     return bigquery.Client(project=PROJECT_ID)
 
 
-def table_exists(client: bigquery.Client, dataset: str, table: str) -> bool:
-    """Check if a table exists."""
+# Dataset metadata, fetched with one INFORMATION_SCHEMA query per dataset
+# and reused for every table in the run
+_tables_cache: Dict[str, Set[str]] = {}
+_columns_cache: Dict[str, Dict[str, Set[str]]] = {}
+
+
+def get_existing_tables(client: bigquery.Client, dataset: str) -> Set[str]:
+    """Get the names of all tables in a dataset (one INFORMATION_SCHEMA query, cached)."""
+    if dataset in _tables_cache:
+        return _tables_cache[dataset]
+
+    query = f"""
+        SELECT table_name
+        FROM `{PROJECT_ID}.{dataset}.INFORMATION_SCHEMA.TABLES`
+    """
     try:
-        client.get_table(f"{PROJECT_ID}.{dataset}.{table}")
-        return True
+        tables = {row.table_name for row in client.query(query).result()}
+    except Exception as e:
+        print(f"  Error listing tables in {dataset}: {e}")
+        return set()
+
+    _tables_cache[dataset] = tables
+    return tables
+
+
+def get_dataset_columns(client: bigquery.Client, dataset: str) -> Dict[str, Set[str]]:
+    """Get table -> column names for every table in a dataset (one query, cached)."""
+    if dataset in _columns_cache:
+        return _columns_cache[dataset]
+
+    query = f"""
+        SELECT table_name, column_name
+        FROM `{PROJECT_ID}.{dataset}.INFORMATION_SCHEMA.COLUMNS`
+    """
+    columns: Dict[str, Set[str]] = {}
+    try:
+        for row in client.query(query).result():
+            columns.setdefault(row.table_name, set()).add(row.column_name)
     except Exception:
-        return False
+        return {}
+
+    _columns_cache[dataset] = columns
+    return columns
+
+
+def _brand_job_config(brand: Optional[str]) -> Optional[bigquery.QueryJobConfig]:
+    """Job config binding @brand, or None for queries without a brand filter."""
+    if not brand:
+        return None
+    return bigquery.QueryJobConfig(
+        query_parameters=[bigquery.ScalarQueryParameter("brand", "STRING", brand)]
+    )
+
+
+def _row_count_query(dataset: str, table: str, brand_col: str) -> str:
+    """Per-brand row count for one table, tagged with the table name."""
+    return f"""
+        SELECT '{table}' as table_name, {brand_col} as brand, COUNT(*) as row_count
+        FROM `{PROJECT_ID}.{dataset}.{table}`
+        GROUP BY {brand_col}
+    """
+
 
+def get_row_counts(client: bigquery.Client, tables: List[str]) -> Dict[str, dict]:
+    """
+    Get row counts per brand for both datasets, for all tables at once.
 
-def get_row_counts(client: bigquery.Client, table: str) -> dict:
-    """Get row counts per brand for both datasets."""
-    results = {"v1": {}, "v2": {}, "v1_total": 0, "v2_total": 0}
+    Each dataset is counted with a single UNION ALL query (one arm per table)
+    instead of one query per table. If that query fails (e.g. one table lacks
+    the brand column), the tables are counted one by one so the error is
+    reported for the right table and the others still get counts.
+
+    Returns:
+        Dict of table -> {"v1": {brand: count}, "v2": {...}, "v1_total", "v2_total"}
+    """
+    results = {
+        table: {"v1": {}, "v2": {}, "v1_total": 0, "v2_total": 0}
+        for table in tables
+    }
+    if not tables:
+        return results
 
+    # Submit both datasets' queries before waiting on either, so they run
+    # concurrently in BigQuery
+    jobs = []
     for version, dataset, brand_col in [
         ("v1", V1_DATASET, V1_BRAND_COL),
         ("v2", V2_DATASET, V2_BRAND_COL)
     ]:
-        if not table_exists(client, dataset, table):
-            continue
-
-        query = f"""
-            SELECT {brand_col} as brand, COUNT(*) as row_count
-            FROM `{PROJECT_ID}.{dataset}.{table}`
-            GROUP BY {brand_col}
-            ORDER BY {brand_col}
-        """
+        queries = [_row_count_query(dataset, table, brand_col) for table in tables]
+        jobs.append((version, queries, client.query("UNION ALL".join(queries))))
 
+    for version, queries, job in jobs:
         try:
-            rows = client.query(query).result()
-            for row in rows:
-                brand = row.brand or "(empty)"
-                results[version][brand] = row.row_count
-                results[f"{version}_total"] += row.row_count
-        except Exception as e:
-            print(f"  Error querying {version}: {e}")
+            rows = list(job.result())
+        except Exception:
+            rows = []
+            for table, query in zip(tables, queries):
+                try:
+                    rows.extend(client.query(query).result())
+                except Exception as e:
+                    print(f"  Error querying {version} {table}: {e}")
+
+        for row in rows:
+            counts = results[row.table_name]
+            brand = row.brand or "(empty)"
+            counts[version][brand] = row.row_count
+            counts[f"{version}_total"] += row.row_count
 
     return results
 
 
-def compare_row_counts(client: bigquery.Client, table: str) -> dict:
-    """Compare row counts between v1 and v2."""
-    counts = get_row_counts(client, table)
-
+def compare_row_counts(table: str, counts: dict) -> dict:
+    """Compare row counts between v1 and v2 (counts from get_row_counts)."""
     all_brands = set(counts["v1"].keys()) | set(counts["v2"].keys())
 
     comparison = {
@@ -129,28 +211,15 @@ def compare_row_counts(client: bigquery.Client, table: str) -> dict:
 
 def get_common_columns(client: bigquery.Client, table: str) -> list:
     """Get columns that exist in both v1 and v2 tables."""
-    columns = {"v1": set(), "v2": set()}
-
-    for version, dataset in [("v1", V1_DATASET), ("v2", V2_DATASET)]:
-        if not table_exists(client, dataset, table):
-            continue
-
-        query = f"""
-            SELECT column_name
-            FROM `{PROJECT_ID}.{dataset}.INFORMATION_SCHEMA.COLUMNS`
-            WHERE table_name = '{table}'
-        """
-
-        try:
-            rows = client.query(query).result()
-            columns[version] = {row.column_name for row in rows}
-        except Exception:
-            pass
+    # Missing tables simply have no entry in INFORMATION_SCHEMA.COLUMNS
+    columns = {
+        version: get_dataset_columns(client, dataset).get(table, set())
+        for version, dataset in [("v1", V1_DATASET), ("v2", V2_DATASET)]
+    }
 
     # Return common columns, excluding v1-specific metadata
-    v1_only_metadata = {"_import_id", "_source_file", "_import_timestamp", "_row_number"}
     common = columns["v1"] & columns["v2"]
-    return sorted(common - v1_only_metadata)
+    return sorted(common - V1_ONLY_METADATA)
 
 
 def compare_data_sample(
@@ -166,103 +235,138 @@ def compare_data_sample(
         return {"error": "No common columns found"}
 
     # Build column list for comparison (exclude brand columns from hash)
-    data_cols = [c for c in common_cols if c not in (V1_BRAND_COL, V2_BRAND_COL, "_brand_code", "akun")]
+    data_cols = [c for c in common_cols if c not in BRAND_COLS]
     if not data_cols:
         return {"error": "No data columns to compare"}
 
     cols_str = ", ".join(data_cols)
-    hash_expr = f"TO_JSON_STRING(STRUCT({cols_str}))"
-
-    # Get sample from v1
-    v1_brand_filter = f"AND {V1_BRAND_COL} = '{brand}'" if brand else ""
-    v1_query = f"""
-        SELECT {V1_BRAND_COL} as brand, {hash_expr} as row_hash
-        FROM `{PROJECT_ID}.{V1_DATASET}.{table}`
-        WHERE 1=1 {v1_brand_filter}
-        LIMIT {limit}
+    # INT64 fingerprint computed by BigQuery: 8 bytes per row over the wire
+    hash_expr = f"FARM_FINGERPRINT(TO_JSON_STRING(STRUCT({cols_str})))"
+
+    # Sample each side, then compare the (brand, hash) sets in BigQuery.
+    # Each sample is referenced once (one FULL OUTER JOIN), so its LIMIT is
+    # evaluated once; keying on TO_JSON_STRING(brand) lets NULL brands match.
+    v1_brand_filter = f"AND {V1_BRAND_COL} = @brand" if brand else ""
+    v2_brand_filter = f"AND {V2_BRAND_COL} = @brand" if brand else ""
+    query = f"""
+        WITH v1 AS (
+            SELECT DISTINCT TO_JSON_STRING(brand) as brand_key, row_hash, TRUE as in_v1
+            FROM (
+                SELECT {V1_BRAND_COL} as brand, {hash_expr} as row_hash
+                FROM `{PROJECT_ID}.{V1_DATASET}.{table}`
+                WHERE 1=1 {v1_brand_filter}
+                LIMIT {limit}
+            )
+        ),
+        v2 AS (
+            SELECT DISTINCT TO_JSON_STRING(brand) as brand_key, row_hash, TRUE as in_v2
+            FROM (
+                SELECT {V2_BRAND_COL} as brand, {hash_expr} as row_hash
+                FROM `{PROJECT_ID}.{V2_DATASET}.{table}`
+                WHERE 1=1 {v2_brand_filter}
+                LIMIT {limit}
+            )
+        )
+        SELECT
+            COUNTIF(in_v1) as v1_sample_size,
+            COUNTIF(in_v2) as v2_sample_size,
+            COUNTIF(in_v1 AND in_v2) as matching_rows,
+            COUNTIF(in_v1 AND in_v2 IS NULL) as only_in_v1,
+            COUNTIF(in_v2 AND in_v1 IS NULL) as only_in_v2
+        FROM v1 FULL OUTER JOIN v2 USING (brand_key, row_hash)
     """
 
-    v1_hashes = set()
     try:
-        for row in client.query(v1_query).result():
-            v1_hashes.add((row.brand, row.row_hash))
+        job = client.query(query, job_config=_brand_job_config(brand))
+        result = next(iter(job.result()))
     except Exception as e:
-        return {"error": f"V1 query failed: {e}"}
-
-    # Get sample from v2
-    v2_brand_filter = f"AND {V2_BRAND_COL} = '{brand}'" if brand else ""
-    v2_query = f"""
-        SELECT {V2_BRAND_COL} as brand, {hash_expr} as row_hash
-        FROM `{PROJECT_ID}.{V2_DATASET}.{table}`
-        WHERE 1=1 {v2_brand_filter}
-        LIMIT {limit}
-    """
-
-    v2_hashes = set()
-    try:
-        for row in client.query(v2_query).result():
-            v2_hashes.add((row.brand, row.row_hash))
-    except Exception as e:
-        return {"error": f"V2 query failed: {e}"}
-
-    # Compare
-    only_in_v1 = v1_hashes - v2_hashes
-    only_in_v2 = v2_hashes - v1_hashes
-    common = v1_hashes & v2_hashes
+        return {"error": f"Comparison query failed: {e}"}
 
     return {
         "columns_compared": len(data_cols),
-        "v1_sample_size": len(v1_hashes),
-        "v2_sample_size": len(v2_hashes),
-        "matching_rows": len(common),
-        "only_in_v1": len(only_in_v1),
-        "only_in_v2": len(only_in_v2),
-        "match_rate": len(common) / max(len(v1_hashes), 1) * 100,
+        "v1_sample_size": result.v1_sample_size,
+        "v2_sample_size": result.v2_sample_size,
+        "matching_rows": result.matching_rows,
+        "only_in_v1": result.only_in_v1,
+        "only_in_v2": result.only_in_v2,
+        "match_rate": result.matching_rows / max(result.v1_sample_size, 1) * 100,
     }
 
 
-def print_comparison(comparison: dict):
-    """Print comparison results in a readable format."""
+def format_comparison(comparison: dict) -> str:
+    """
+    Format comparison results in a readable format.
+
+    Built as one string so the report is written with a single call.
+    """
     table = comparison["table"]
+    lines = []
 
-    print(f"\n{'='*60}")
-    print(f"TABLE: {table}")
-    print(f"{'='*60}")
+    lines.append(f"\n{'='*60}")
+    lines.append(f"TABLE: {table}")
+    lines.append(f"{'='*60}")
 
     # Total counts
     v1_total = comparison["v1_total"]
     v2_total = comparison["v2_total"]
     status = "✅ MATCH" if comparison["total_match"] else "❌ MISMATCH"
 
-    print(f"\nTotal Rows:")
-    print(f"  v1 (ibot_data):    {v1_total:,}")
-    print(f"  v2 (ibot_v2_data): {v2_total:,}")
-    print(f"  Status: {status}")
+    lines.append(f"\nTotal Rows:")
+    lines.append(f"  v1 (ibot_data):    {v1_total:,}")
+    lines.append(f"  v2 (ibot_v2_data): {v2_total:,}")
+    lines.append(f"  Status: {status}")
 
     if v1_total == 0 and v2_total == 0:
-        print("  (Both tables are empty)")
-        return
+        lines.append("  (Both tables are empty)")
+        return "\n".join(lines)
 
     # Brand breakdown
     if comparison["brands"]:
-        print(f"\nBrand Breakdown:")
-        print(f"  {'Brand':<10} {'v1':>10} {'v2':>10} {'Diff':>10} {'Status':<10}")
-        print(f"  {'-'*50}")
+        lines.append(f"\nBrand Breakdown:")
+        lines.append(f"  {'Brand':<10} {'v1':>10} {'v2':>10} {'Diff':>10} {'Status':<10}")
+        lines.append(f"  {'-'*50}")
 
         for b in comparison["brands"]:
             status = "✅" if b["match"] else "❌"
             diff_str = f"{b['diff']:+d}" if b["diff"] != 0 else "0"
-            print(f"  {b['brand']:<10} {b['v1']:>10,} {b['v2']:>10,} {diff_str:>10} {status}")
+            lines.append(f"  {b['brand']:<10} {b['v1']:>10,} {b['v2']:>10,} {diff_str:>10} {status}")
 
     # Issues summary
     if comparison["missing_in_v1"]:
-        print(f"\n⚠️  Brands missing in v1: {', '.join(comparison['missing_in_v1'])}")
+        lines.append(f"\n⚠️  Brands missing in v1: {', '.join(comparison['missing_in_v1'])}")
 
     if comparison["missing_in_v2"]:
-        print(f"\n⚠️  Brands missing in v2: {', '.join(comparison['missing_in_v2'])}")
+        lines.append(f"\n⚠️  Brands missing in v2: {', '.join(comparison['missing_in_v2'])}")
 
     if comparison["mismatched"]:
-        print(f"\n❌ Row count mismatches: {len(comparison['mismatched'])} brands")
+        lines.append(f"\n❌ Row count mismatches: {len(comparison['mismatched'])} brands")
+
+    return "\n".join(lines)
+
+
+def _sample_rows_query(
+    dataset: str,
+    table: str,
+    brand_col: str,
+    data_cols: List[str],
+    row_fp: str,
+    fingerprints: List[int],
+    limit: int = 3,
+) -> Optional[str]:
+    """
+    Query for up to `limit` full rows with the given fingerprints, for the
+    brand bound as @brand (None if there are no fingerprints).
+    """
+    if not fingerprints:
+        return None
+
+    fp_list = ", ".join(str(fp) for fp in fingerprints[:limit])
+    return f"""
+        SELECT {', '.join(data_cols)}
+        FROM `{PROJECT_ID}.{dataset}.{table}`
+        WHERE {brand_col} = @brand AND {row_fp} IN UNNEST([{fp_list}])
+        LIMIT {limit}
+    """
 
 
 def compare_brand_data_detailed(
@@ -279,33 +383,47 @@ def compare_brand_data_detailed(
         return {"error": "No common columns found"}
 
     # Exclude brand columns and metadata
-    data_cols = [c for c in common_cols if c not in (
-        V1_BRAND_COL, V2_BRAND_COL, "_brand_code", "akun",
-        "import_timestamp", "import_batch_id"
-    )]
+    data_cols = [c for c in common_cols if c not in DETAILED_EXCLUDED_COLS]
 
     if not data_cols:
         return {"error": "No data columns to compare"}
 
-    # Get all rows from v1
-    v1_query = f"""
-        SELECT {', '.join(data_cols)}
-        FROM `{PROJECT_ID}.{V1_DATASET}.{table}`
-        WHERE {V1_BRAND_COL} = '{brand}'
-        ORDER BY {', '.join(data_cols[:3])}
-    """
-
-    # Get all rows from v2
-    v2_query = f"""
-        SELECT {', '.join(data_cols)}
-        FROM `{PROJECT_ID}.{V2_DATASET}.{table}`
-        WHERE {V2_BRAND_COL} = '{brand}'
-        ORDER BY {', '.join(data_cols[:3])}
+    # Fingerprint each row server-side with the same normalization as
+    # comparing values in Python: NULL -> "", everything else as a string
+    row_fp = "FARM_FINGERPRINT(TO_JSON_STRING([{}]))".format(
+        ", ".join(f"IFNULL(CAST({col} AS STRING), '')" for col in data_cols)
+    )
+
+    # Compare the fingerprint sets in BigQuery: per-side counts per distinct
+    # fingerprint, joined once; only the counts and up to 3 sample
+    # fingerprints per side come back
+    query = f"""
+        WITH v1 AS (
+            SELECT {row_fp} as fp, COUNT(*) as n
+            FROM `{PROJECT_ID}.{V1_DATASET}.{table}`
+            WHERE {V1_BRAND_COL} = @brand
+            GROUP BY fp
+        ),
+        v2 AS (
+            SELECT {row_fp} as fp, COUNT(*) as n
+            FROM `{PROJECT_ID}.{V2_DATASET}.{table}`
+            WHERE {V2_BRAND_COL} = @brand
+            GROUP BY fp
+        )
+        SELECT
+            IFNULL(SUM(v1.n), 0) as v1_rows,
+            IFNULL(SUM(v2.n), 0) as v2_rows,
+            COUNTIF(v1.n IS NOT NULL AND v2.n IS NOT NULL) as matching,
+            COUNTIF(v2.n IS NULL) as only_in_v1,
+            COUNTIF(v1.n IS NULL) as only_in_v2,
+            ARRAY_AGG(IF(v2.n IS NULL, fp, NULL) IGNORE NULLS LIMIT 3) as sample_v1_fps,
+            ARRAY_AGG(IF(v1.n IS NULL, fp, NULL) IGNORE NULLS LIMIT 3) as sample_v2_fps
+        FROM v1 FULL OUTER JOIN v2 USING (fp)
     """
 
+    job_config = _brand_job_config(brand)
     try:
-        v1_rows = list(client.query(v1_query).result())
-        v2_rows = list(client.query(v2_query).result())
+        result = next(iter(client.query(query, job_config=job_config).result()))
     except Exception as e:
         return {"error": str(e)}
 
@@ -313,24 +431,112 @@ def compare_brand_data_detailed(
     def row_to_tuple(row):
         return tuple(str(row[col]) if row[col] is not None else "" for col in data_cols)
 
-    v1_set = set(row_to_tuple(r) for r in v1_rows)
-    v2_set = set(row_to_tuple(r) for r in v2_rows)
-
-    matching = v1_set & v2_set
-    only_v1 = v1_set - v2_set
-    only_v2 = v2_set - v1_set
+    # Sample rows for the mismatches, both sides submitted together
+    sample_queries = [
+        _sample_rows_query(V1_DATASET, table, V1_BRAND_COL, data_cols, row_fp, result.sample_v1_fps),
+        _sample_rows_query(V2_DATASET, table, V2_BRAND_COL, data_cols, row_fp, result.sample_v2_fps),
+    ]
+    try:
+        sample_jobs = [
+            client.query(q, job_config=job_config) if q else None
+            for q in sample_queries
+        ]
+        sample_v1_only, sample_v2_only = [
+            [row_to_tuple(r) for r in job.result()] if job else []
+            for job in sample_jobs
+        ]
+    except Exception as e:
+        return {"error": str(e)}
 
     return {
         "brand": brand,
         "columns": data_cols,
-        "v1_rows": len(v1_rows),
-        "v2_rows": len(v2_rows),
-        "matching": len(matching),
-        "only_in_v1": len(only_v1),
-        "only_in_v2": len(only_v2),
-        "match_rate": len(matching) / max(len(v1_rows), len(v2_rows), 1) * 100,
-        "sample_v1_only": list(only_v1)[:3],
-        "sample_v2_only": list(only_v2)[:3],
+        "v1_rows": result.v1_rows,
+        "v2_rows": result.v2_rows,
+        "matching": result.matching,
+        "only_in_v1": result.only_in_v1,
+        "only_in_v2": result.only_in_v2,
+        "match_rate": result.matching / max(result.v1_rows, result.v2_rows, 1) * 100,
+        "sample_v1_only": sample_v1_only,
+        "sample_v2_only": sample_v2_only,
+    }
+
+
+def check_table(
+    client: bigquery.Client,
+    table: str,
+    v1_exists: bool,
+    v2_exists: bool,
+    counts: Optional[dict],
+    target_brand: Optional[str] = None,
+) -> Tuple[str, Optional[dict]]:
+    """
+    Run every comparison for one table.
+
+    Args:
+        counts: This table's entry from get_row_counts (None if it isn't in both datasets)
+
+    Returns:
+        Tuple of (report text, summary entry or None if the table was skipped)
+    """
+    if not v1_exists and not v2_exists:
+        return f"\n⚪ {table}: Both tables don't exist (skipping)", None
+    elif not v1_exists:
+        return f"\n⚠️  {table}: Only exists in v2", None
+    elif not v2_exists:
+        return f"\n⚠️  {table}: Only exists in v1", None
+
+    # Compare row counts
+    comparison = compare_row_counts(table, counts)
+    lines = [format_comparison(comparison)]
+
+    # If specific brand requested, do detailed data comparison
+    if target_brand:
+        lines.append(f"\n  Detailed Data Comparison for brand '{target_brand}':")
+        data_comp = compare_brand_data_detailed(client, table, target_brand)
+
+        if "error" in data_comp:
+            lines.append(f"    Error: {data_comp['error']}")
+        else:
+            match_rate = data_comp["match_rate"]
+            status = "✅" if match_rate == 100 else "⚠️"
+            lines.append(f"    Columns compared: {len(data_comp['columns'])}")
+            lines.append(f"    v1 rows: {data_comp['v1_rows']}")
+            lines.append(f"    v2 rows: {data_comp['v2_rows']}")
+            lines.append(f"    Matching rows: {data_comp['matching']}")
+            lines.append(f"    Only in v1: {data_comp['only_in_v1']}")
+            lines.append(f"    Only in v2: {data_comp['only_in_v2']}")
+            lines.append(f"    Match rate: {match_rate:.1f}% {status}")
+
+            if data_comp["sample_v1_only"]:
+                lines.append(f"\n    Sample rows only in v1:")
+                for row in data_comp["sample_v1_only"][:2]:
+                    lines.append(f"      {row[:5]}...")  # Show first 5 columns
+
+            if data_comp["sample_v2_only"]:
+                lines.append(f"\n    Sample rows only in v2:")
+                for row in data_comp["sample_v2_only"][:2]:
+                    lines.append(f"      {row[:5]}...")  # Show first 5 columns
+
+    elif comparison["total_match"] and comparison["v1_total"] > 0:
+        lines.append(f"\n  Data Comparison (sample):")
+        data_comp = compare_data_sample(client, table, target_brand, limit=500)
+
+        if "error" in data_comp:
+            lines.append(f"    Error: {data_comp['error']}")
+        else:
+            match_rate = data_comp["match_rate"]
+            status = "✅" if match_rate == 100 else "⚠️"
+            lines.append(f"    Columns compared: {data_comp['columns_compared']}")
+            lines.append(f"    Sample size: v1={data_comp['v1_sample_size']}, v2={data_comp['v2_sample_size']}")
+            lines.append(f"    Matching rows: {data_comp['matching_rows']}")
+            lines.append(f"    Match rate: {match_rate:.1f}% {status}")
+
+    return "\n".join(lines), {
+        "table": table,
+        "match": comparison["total_match"],
+        "v1": comparison["v1_total"],
+        "v2": comparison["v2_total"],
     }
 
 
@@ -338,9 +544,16 @@ def main():
     client = get_client()
 
     # Parse arguments
-    target_table = sys.argv[1] if len(sys.argv) > 1 else None
-    target_brand = sys.argv[2] if len(sys.argv) > 2 and not sys.argv[2].startswith("--") else None
-    detailed_mode = "--detailed" in sys.argv or "-d" in sys.argv
+    parser = argparse.ArgumentParser(description="Compare iBot v1 and v2 BigQuery data.")
+    parser.add_argument("table", nargs="?", help="Compare only this table")
+    parser.add_argument("brand", nargs="?", help="Row-by-row comparison for this brand")
+    parser.add_argument(
+        "-d", "--detailed", action="store_true",
+        help="Accepted for compatibility; the detailed comparison runs whenever a brand is given",
+    )
+    args = parser.parse_intermixed_args()
+    target_table = args.table
+    target_brand = args.brand
 
     tables_to_check = [target_table] if target_table else TABLES
 
@@ -350,79 +563,43 @@ def main():
     print(f"v1 Dataset: {PROJECT_ID}.{V1_DATASET}")
     print(f"v2 Dataset: {PROJECT_ID}.{V2_DATASET}")
 
+    # Table existence and row counts, fetched up front for all tables
+    v1_tables = get_existing_tables(client, V1_DATASET)
+    v2_tables = get_existing_tables(client, V2_DATASET)
+    all_counts = get_row_counts(
+        client,
+        [t for t in tables_to_check if t in v1_tables and t in v2_tables],
+    )
+
+    # Warm the per-dataset column cache before the workers need it
+    if all_counts:
+        get_dataset_columns(client, V1_DATASET)
+        get_dataset_columns(client, V2_DATASET)
+
     all_match = True
     summary = []
 
-    for table in tables_to_check:
-        # Check if tables exist
-        v1_exists = table_exists(client, V1_DATASET, table)
-        v2_exists = table_exists(client, V2_DATASET, table)
-
-        if not v1_exists and not v2_exists:
-            print(f"\n⚪ {table}: Both tables don't exist (skipping)")
-            continue
-        elif not v1_exists:
-            print(f"\n⚠️  {table}: Only exists in v2")
-            continue
-        elif not v2_exists:
-            print(f"\n⚠️  {table}: Only exists in v1")
-            continue
-
-        # Compare row counts
-        comparison = compare_row_counts(client, table)
-        print_comparison(comparison)
-
-        if not comparison["total_match"]:
-            all_match = False
-
-        # If specific brand requested, do detailed data comparison
-        if target_brand:
-            print(f"\n  Detailed Data Comparison for brand '{target_brand}':")
-            data_comp = compare_brand_data_detailed(client, table, target_brand)
-
-            if "error" in data_comp:
-                print(f"    Error: {data_comp['error']}")
-            else:
-                match_rate = data_comp["match_rate"]
-                status = "✅" if match_rate == 100 else "⚠️"
-                print(f"    Columns compared: {len(data_comp['columns'])}")
-                print(f"    v1 rows: {data_comp['v1_rows']}")
-                print(f"    v2 rows: {data_comp['v2_rows']}")
-                print(f"    Matching rows: {data_comp['matching']}")
-                print(f"    Only in v1: {data_comp['only_in_v1']}")
-                print(f"    Only in v2: {data_comp['only_in_v2']}")
-                print(f"    Match rate: {match_rate:.1f}% {status}")
-
-                if data_comp["sample_v1_only"]:
-                    print(f"\n    Sample rows only in v1:")
-                    for row in data_comp["sample_v1_only"][:2]:
-                        print(f"      {row[:5]}...")  # Show first 5 columns
-
-                if data_comp["sample_v2_only"]:
-                    print(f"\n    Sample rows only in v2:")
-                    for row in data_comp["sample_v2_only"][:2]:
-                        print(f"      {row[:5]}...")  # Show first 5 columns
-
-        elif comparison["total_match"] and comparison["v1_total"] > 0:
-            print(f"\n  Data Comparison (sample):")
-            data_comp = compare_data_sample(client, table, target_brand, limit=500)
-
-            if "error" in data_comp:
-                print(f"    Error: {data_comp['error']}")
-            else:
-                match_rate = data_comp["match_rate"]
-                status = "✅" if match_rate == 100 else "⚠️"
-                print(f"    Columns compared: {data_comp['columns_compared']}")
-                print(f"    Sample size: v1={data_comp['v1_sample_size']}, v2={data_comp['v2_sample_size']}")
-                print(f"    Matching rows: {data_comp['matching_rows']}")
-                print(f"    Match rate: {match_rate:.1f}% {status}")
-
-        summary.append({
-            "table": table,
-            "match": comparison["total_match"],
-            "v1": comparison["v1_total"],
-            "v2": comparison["v2_total"],
-        })
+    # Tables are compared concurrently (each mostly waits on BigQuery);
+    # reports are printed in table order as they become available
+    with ThreadPoolExecutor(max_workers=COMPARE_MAX_WORKERS) as executor:
+        results = executor.map(
+            lambda table: check_table(
+                client,
+                table,
+                table in v1_tables,
+                table in v2_tables,
+                all_counts.get(table),
+                target_brand,
+            ),
+            tables_to_check,
+        )
+        for report, entry in results:
+            print(report)
+            if entry is None:
+                continue
+            summary.append(entry)
+            if not entry["match"]:
+                all_match = False
 
     # Final summary
     print("\n" + "="*60)
@@ -9,9 +9,13 @@ BigQuery: admin_config dataset
 """
 
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 
+from utils.columns import column_names
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,14 +27,21 @@ CONFIG_DATASET = "admin_config"
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CategoryConfig:
-    """Configuration for a data category."""
+    """
+    Configuration for a data category.
+
+    Loaded once and shared by every file of the function instance, so it is
+    frozen (read-only) and slotted (no per-instance __dict__).
+    required_headers is a tuple so the standard header order can't be
+    mutated through the shared instance either.
+    """
     name: str
     category_type: str
     marketplace: str
     bigquery_table: str
-    required_headers: List[str]
+    required_headers: Tuple[str, ...]
     slack_webhook_url: str = ""
     header_row: int = 0
     data_start_row: int = 1
@@ -52,9 +63,6 @@ class Settings:
     SLACK_CHANNEL: str = os.getenv("SLACK_CHANNEL", "#ibot-v2-notifications")
     SLACK_MENTION_USER: str = os.getenv("SLACK_MENTION_USER", "<@U0A6B24777X>")
 
-    # Processing
-    BATCH_SIZE: int = int(os.getenv("BATCH_SIZE", "500"))
-
     # Feature flags
     BIGQUERY_ENABLED: bool = os.getenv("BIGQUERY_ENABLED", "true").lower() == "true"
     SLACK_ENABLED: bool = os.getenv("SLACK_ENABLED", "true").lower() == "true"
@@ -67,34 +75,59 @@ settings = Settings()
 # Dynamic Config Loading - BigQuery First, Sheets Fallback
 # ============================================================
 
-_categories_cache: Optional[Dict[str, CategoryConfig]] = None
+# Loaded categories are reused for CATEGORIES_TTL_SECONDS, then reloaded so
+# Admin Sheet changes reach running instances. A failed load is retried after
+# CATEGORIES_RETRY_SECONDS rather than on every file.
+CATEGORIES_TTL_SECONDS = int(os.getenv("CATEGORIES_TTL_SECONDS", "600"))
+CATEGORIES_RETRY_SECONDS = 30
+
+# (expires at, per time.monotonic(); categories; categories by lowercase name)
+_categories_cache: Optional[
+    Tuple[float, Dict[str, CategoryConfig], Dict[str, CategoryConfig]]
+] = None
+# Guards cache misses, so concurrent requests in one process load config once
+_categories_lock = threading.Lock()
 _sheets_service = None
 _bq_client = None
+# Guard client creation, so the concurrent config loads share one client
+_bq_client_lock = threading.Lock()
+_sheets_service_lock = threading.Lock()
+
+# List sheet columns that may hold the Slack Webhook URL, in lookup order
+_WEBHOOK_COLUMNS = ("H", "I", "J", "K")
+# type_validation: Category, Header Row, Data Row, then headers E-Z (D unused)
+_TYPE_VALIDATION_COLUMNS = ("A", "B", "C") + column_names(26)[4:]
+# unique_column: Category, Standard Column, Action, then replacements D-J
+_UNIQUE_COLUMN_COLUMNS = column_names(10)
 
 
 def _get_bq_client():
-    """Get BigQuery client (cached)."""
+    """Get BigQuery client (created once per process)."""
     global _bq_client
     if _bq_client is None:
-        from google.cloud import bigquery
-        _bq_client = bigquery.Client(project=PROJECT_ID)
+        with _bq_client_lock:
+            if _bq_client is None:
+                from google.cloud import bigquery
+                _bq_client = bigquery.Client(project=PROJECT_ID)
     return _bq_client
 
 
 def _get_sheets_service():
-    """Get authenticated Google Sheets service (cached)."""
+    """Get authenticated Google Sheets service (created once per process)."""
     global _sheets_service
     if _sheets_service is None:
-        try:
-            import google.auth
-            from googleapiclient.discovery import build
-
-            credentials, project = google.auth.default(scopes=SCOPES)
-            _sheets_service = build("sheets", "v4", credentials=credentials)
-            logger.info("Google Sheets service initialized")
-        except Exception as e:
-            logger.error(f"Failed to initialize Sheets service: {e}")
-            raise
+        with _sheets_service_lock:
+            if _sheets_service is None:
+                try:
+                    import google.auth
+                    from googleapiclient.discovery import build
+
+                    credentials, project = google.auth.default(scopes=SCOPES)
+                    _sheets_service = build("sheets", "v4", credentials=credentials)
+                    logger.info("Google Sheets service initialized")
+                except Exception as e:
+                    logger.error(f"Failed to initialize Sheets service: {e}")
+                    raise
     return _sheets_service
 
 
@@ -102,15 +135,95 @@ def _get_sheets_service():
 # BigQuery Config Loading
 # ============================================================
 
+def _select_columns(table, columns: Tuple[str, ...]) -> str:
+    """
+    Build the SELECT list for a config table read by position.
+
+    Config tables are only as wide as their sheet, so columns missing from
+    the schema are selected as NULL to keep every position fixed.
+    """
+    table_columns = {f.name for f in table.schema}
+    return ", ".join(col if col in table_columns else f"NULL AS {col}" for col in columns)
+
+
 def _load_categories_from_bigquery() -> Optional[Dict[str, CategoryConfig]]:
     """
-    Load categories from BigQuery admin_config.categories table.
+    Load categories from BigQuery admin_config tables.
+
+    The categories (webhooks), type_validation and unique_column tables are
+    independent, so the three queries run concurrently.
+
+    Returns None if a required table doesn't exist or is empty (config needs
+    a sync from Sheets), or {} if type_validation exists but has no
+    categories (e.g. mid-edit in the Admin Sheet).
+    """
+    try:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            type_future = executor.submit(_load_type_validation_from_bigquery)
+            alias_future = executor.submit(_load_unique_column_from_bigquery)
+
+            webhooks = _load_webhooks_from_bigquery()
+            if webhooks is None:
+                return None
+
+            # Now load Type Validation data
+            type_configs = type_future.result()
+
+            if type_configs is None:
+                logger.info("No type validation data in BigQuery")
+                return None
+            if not type_configs:
+                # Syncing would only copy the same empty sheet again
+                logger.warning("BigQuery type validation table has no categories")
+                return {}
+
+            # Load column aliases from Unique Column sheet
+            all_aliases = alias_future.result()
+
+        # Merge with webhooks and aliases
+        categories = {}
+        for cat in type_configs:
+            name = cat["name"]
+
+            # Merge header_aliases from Type Validation with column_aliases from Unique Column
+            merged_aliases = dict(cat.get("header_aliases", {}))
+            unique_aliases = all_aliases.get(name, {})
+            for std_col, aliases in unique_aliases.items():
+                if std_col not in merged_aliases:
+                    merged_aliases[std_col] = []
+                merged_aliases[std_col].extend(aliases)
+
+            categories[name] = CategoryConfig(
+                name=name,
+                category_type=cat["category_type"],
+                marketplace=cat["marketplace"],
+                bigquery_table=cat["bigquery_table"],
+                required_headers=tuple(cat["required_headers"]),
+                slack_webhook_url=webhooks.get(name, ""),
+                header_row=cat["header_row"],
+                data_start_row=cat["data_start_row"],
+                column_aliases=merged_aliases,
+            )
+
+        logger.info(f"Loaded {len(categories)} categories from BigQuery")
+        return categories
+
+    except Exception as e:
+        logger.warning(f"Failed to load from BigQuery: {e}")
+        return None
+
+
+def _load_webhooks_from_bigquery() -> Optional[Dict[str, str]]:
+    """
+    Load Slack webhook URLs from BigQuery admin_config.categories table.
 
     Table format (Excel-style columns):
     - Row 1: Headers (A=Category, B=Role, C=..., H=Slack Webhook URL, etc.)
     - Row 2+: Data
 
-    Returns None if table doesn't exist or is empty.
+    Returns:
+        Dict mapping category_name -> webhook URL (Central role only),
+        or None if the table doesn't exist or is empty
     """
     try:
         from google.cloud.exceptions import NotFound
@@ -120,55 +233,51 @@ def _load_categories_from_bigquery() -> Optional[Dict[str, CategoryConfig]]:
 
         # Check if table exists
         try:
-            client.get_table(table_id)
+            table = client.get_table(table_id)
         except NotFound:
             logger.info("BigQuery categories table not found, will use Sheets")
             return None
 
-        # Query all rows
-        query = f"SELECT * FROM `{table_id}`"
-        rows = list(client.query(query).result())
-
-        if not rows:
-            logger.info("BigQuery categories table is empty")
-            return None
+        # Only Category (A), Role (B) and the columns the Slack webhook may be
+        # in are read. The table is as wide as the List sheet, so candidates
+        # missing from its schema are left out of the projection.
+        table_columns = {f.name for f in table.schema}
+        webhook_candidates = [col for col in _WEBHOOK_COLUMNS if col in table_columns]
+        query = f"SELECT {', '.join(['A', 'B', *webhook_candidates])} FROM `{table_id}`"
 
-        # First row should be headers
+        # Rows are positional: 0=A, 1=B, 2.. = webhook_candidates
         header_row = None
         data_rows = []
-        for row in rows:
-            row_dict = dict(row)
+        for row in client.query_and_wait(query):
             # Check if this is the header row (A column contains header-like text)
-            a_val = row_dict.get("A", "")
+            a_val = row[0]
             if a_val and a_val.lower() in ["category", "kategori", "name"]:
-                header_row = row_dict
+                header_row = row
             else:
-                data_rows.append(row_dict)
+                data_rows.append(row)
+
+        if header_row is None and not data_rows:
+            logger.info("BigQuery categories table is empty")
+            return None
 
-        if not header_row:
+        if header_row is None:
             # Assume first row is header if not identified
-            if rows:
-                header_row = dict(rows[0])
-                data_rows = [dict(r) for r in rows[1:]]
-
-        # Find column indices for important fields
-        # Headers are in columns A, B, C, etc.
-        # We need: Category (A), Role (B), Slack Webhook URL (H typically)
-        webhook_col = None
-        for col in ["H", "I", "J", "K"]:
-            val = header_row.get(col, "")
+            header_row = data_rows.pop(0)
+
+        # Find the Slack Webhook URL column (H typically)
+        webhook_idx = None
+        for i in range(2, len(header_row)):
+            val = header_row[i]
             if val and "slack" in val.lower() and "webhook" in val.lower():
-                webhook_col = col
+                webhook_idx = i
                 break
 
-        # Build categories from data rows
-        categories = {}
         webhooks = {}
 
         for row in data_rows:
-            category_name = row.get("A", "")
-            role = row.get("B", "")
-            webhook = row.get(webhook_col, "") if webhook_col else ""
+            category_name = row[0]
+            role = row[1]
+            webhook = row[webhook_idx] if webhook_idx is not None else ""
 
             if not category_name:
                 continue
@@ -177,45 +286,10 @@ def _load_categories_from_bigquery() -> Optional[Dict[str, CategoryConfig]]:
             if role == "Central" and webhook:
                 webhooks[category_name] = webhook
 
-        # Now load Type Validation data
-        type_configs = _load_type_validation_from_bigquery()
-
-        if not type_configs:
-            logger.info("No type validation data in BigQuery")
-            return None
-
-        # Load column aliases from Unique Column sheet
-        all_aliases = _load_unique_column_from_bigquery()
-
-        # Merge with webhooks and aliases
-        for cat in type_configs:
-            name = cat["name"]
-
-            # Merge header_aliases from Type Validation with column_aliases from Unique Column
-            merged_aliases = dict(cat.get("header_aliases", {}))
-            unique_aliases = all_aliases.get(name, {})
-            for std_col, aliases in unique_aliases.items():
-                if std_col not in merged_aliases:
-                    merged_aliases[std_col] = []
-                merged_aliases[std_col].extend(aliases)
-
-            categories[name] = CategoryConfig(
-                name=name,
-                category_type=cat["category_type"],
-                marketplace=cat["marketplace"],
-                bigquery_table=cat["bigquery_table"],
-                required_headers=cat["required_headers"],
-                slack_webhook_url=webhooks.get(name, ""),
-                header_row=cat["header_row"],
-                data_start_row=cat["data_start_row"],
-                column_aliases=merged_aliases,
-            )
-
-        logger.info(f"Loaded {len(categories)} categories from BigQuery")
-        return categories
+        return webhooks
 
     except Exception as e:
-        logger.warning(f"Failed to load from BigQuery: {e}")
+        logger.warning(f"Failed to load categories from BigQuery: {e}")
         return None
 
 
@@ -232,23 +306,20 @@ def _load_unique_column_from_bigquery() -> Dict[str, Dict[str, List[str]]]:
         table_id = f"{PROJECT_ID}.{CONFIG_DATASET}.unique_column"
 
         try:
-            client.get_table(table_id)
+            table = client.get_table(table_id)
         except NotFound:
             logger.debug("BigQuery unique_column table not found")
             return {}
 
-        query = f"SELECT * FROM `{table_id}`"
-        rows = list(client.query(query).result())
-
-        if not rows:
-            return {}
+        # Rows are positional, in _UNIQUE_COLUMN_COLUMNS order
+        query = f"SELECT {_select_columns(table, _UNIQUE_COLUMN_COLUMNS)} FROM `{table_id}`"
+        rows = client.query_and_wait(query)
 
         aliases: Dict[str, Dict[str, List[str]]] = {}
         is_first = True
 
         for row in rows:
-            row_dict = dict(row)
-            a_val = row_dict.get("A", "")
+            a_val = row[0]
 
             # Skip header row
             if is_first or (a_val and a_val.lower() in ["category", "kategori"]):
@@ -259,15 +330,11 @@ def _load_unique_column_from_bigquery() -> Dict[str, Dict[str, List[str]]]:
                 continue
 
             category_name = a_val
-            standard_column = row_dict.get("B", "")
-            action_type = row_dict.get("C", "")  # COALESCE_EXACT, etc.
+            standard_column = row[1]
+            action_type = row[2]  # COALESCE_EXACT, etc.
 
             # Columns D onwards contain replacement patterns
-            replacements = []
-            for col in ["D", "E", "F", "G", "H", "I", "J"]:
-                val = row_dict.get(col, "")
-                if val:
-                    replacements.append(val)
+            replacements = [val for val in row[3:] if val]
 
             if not standard_column or not replacements:
                 continue
@@ -300,12 +367,16 @@ def _load_unique_column_from_bigquery() -> Dict[str, Dict[str, List[str]]]:
         return {}
 
 
-def _load_type_validation_from_bigquery() -> List[Dict[str, Any]]:
+def _load_type_validation_from_bigquery() -> Optional[List[Dict[str, Any]]]:
     """Load type validation config from BigQuery.
 
     Handles multiple rows per category (e.g., Indonesian + English headers).
     The FIRST row defines the standard header ORDER.
     Subsequent rows define ALIASES for each corresponding column position.
+
+    Returns:
+        Category dicts; [] if the table exists but has no categories, None if
+        it doesn't exist or can't be read (config needs a sync from Sheets)
     """
     try:
         from google.cloud.exceptions import NotFound
@@ -314,25 +385,21 @@ def _load_type_validation_from_bigquery() -> List[Dict[str, Any]]:
         table_id = f"{PROJECT_ID}.{CONFIG_DATASET}.type_validation"
 
         try:
-            client.get_table(table_id)
+            table = client.get_table(table_id)
         except NotFound:
-            return []
-
-        query = f"SELECT * FROM `{table_id}`"
-        rows = list(client.query(query).result())
+            return None
 
-        if not rows:
-            return []
+        # Rows are positional, in _TYPE_VALIDATION_COLUMNS order
+        query = f"SELECT {_select_columns(table, _TYPE_VALIDATION_COLUMNS)} FROM `{table_id}`"
+        rows = client.query_and_wait(query)
 
         # Group rows by category name
         # First row = standard headers (in order), additional rows = aliases per column
         category_data: Dict[str, Dict[str, Any]] = {}
         is_first = True
-        header_columns = ["E", "F", "G", "H", "I", "J", "K", "L", "M", "N", "O", "P", "Q", "R", "S", "T", "U", "V", "W", "X", "Y", "Z"]
 
         for row in rows:
-            row_dict = dict(row)
-            a_val = row_dict.get("A", "")
+            a_val = row[0]
 
             # Skip header row
             if is_first or (a_val and a_val.lower() in ["category", "kategori"]):
@@ -345,15 +412,12 @@ def _load_type_validation_from_bigquery() -> List[Dict[str, Any]]:
             category_name = a_val
 
             # Extract headers from this row (columns E onwards)
-            row_headers = []
-            for col in header_columns:
-                val = row_dict.get(col, "")
-                row_headers.append(val if val else "")
+            row_headers = [val if val else "" for val in row[3:]]
 
             if category_name not in category_data:
                 # First row for this category - these ARE the standard headers (in order)
-                header_row = int(row_dict.get("B", 1)) - 1 if row_dict.get("B") else 0
-                data_row = int(row_dict.get("C", 2)) - 1 if row_dict.get("C") else 1
+                header_row = int(row[1]) - 1 if row[1] else 0
+                data_row = int(row[2]) - 1 if row[2] else 1
 
                 parts = category_name.rsplit(" ", 1)
                 category_type = parts[0] if len(parts) == 2 else category_name
@@ -397,21 +461,25 @@ def _load_type_validation_from_bigquery() -> List[Dict[str, Any]]:
 
     except Exception as e:
         logger.warning(f"Failed to load type validation from BigQuery: {e}")
-        return []
+        return None
 
 
 # ============================================================
 # Google Sheets Config Loading (Fallback)
 # ============================================================
 
-def _fetch_sheet_data(sheet_name: str, range_str: str = "A1:Z100") -> List[List[str]]:
-    """Fetch data from a specific sheet."""
+def _fetch_sheet_ranges(ranges: List[str]) -> List[List[List[str]]]:
+    """Fetch several sheet ranges in one values.batchGet call (in request order)."""
     service = _get_sheets_service()
-    result = service.spreadsheets().values().get(
+    result = service.spreadsheets().values().batchGet(
         spreadsheetId=SPREADSHEET_ID,
-        range=f"{sheet_name}!{range_str}"
+        ranges=ranges,
     ).execute()
-    return result.get("values", [])
+    value_ranges = result.get("valueRanges", [])
+    return [
+        value_ranges[i].get("values", []) if i < len(value_ranges) else []
+        for i in range(len(ranges))
+    ]
 
 
 def _parse_list_sheet(data: List[List[str]]) -> Dict[str, str]:
@@ -420,27 +488,20 @@ def _parse_list_sheet(data: List[List[str]]) -> Dict[str, str]:
     if not data or len(data) < 2:
         return webhooks
 
-    headers = data[0]
-    webhook_idx = None
-    for i, h in enumerate(headers):
-        if "slack" in h.lower() and "webhook" in h.lower():
-            webhook_idx = i
-            break
-
+    webhook_idx = next(
+        (i for i, h in enumerate(data[0]) if "slack" in h.lower() and "webhook" in h.lower()),
+        None,
+    )
     if webhook_idx is None:
         return webhooks
 
-    for row in data[1:]:
-        if len(row) <= webhook_idx:
-            continue
-        category = row[0] if row else ""
-        role = row[1] if len(row) > 1 else ""
-        webhook = row[webhook_idx] if len(row) > webhook_idx else ""
-
-        if category and role == "Central" and webhook:
-            webhooks[category] = webhook
-
-    return webhooks
+    # Rows need category (0), role (1) and webhook columns
+    min_len = max(webhook_idx, 1) + 1
+    return {
+        row[0]: row[webhook_idx]
+        for row in data[1:]
+        if len(row) >= min_len and row[0] and row[1] == "Central" and row[webhook_idx]
+    }
 
 
 def _parse_type_validation_sheet(data: List[List[str]]) -> List[Dict[str, Any]]:
@@ -507,9 +568,11 @@ def _load_categories_from_sheets() -> Dict[str, CategoryConfig]:
     """Load categories from Google Sheets (fallback)."""
     logger.info("Loading config from Google Sheets (fallback)...")
 
-    list_data = _fetch_sheet_data("List", "A1:I100")
-    type_data = _fetch_sheet_data("Type Validation", "A1:Z50")
-    alias_data = _fetch_sheet_data("Unique Column", "A1:D100")
+    list_data, type_data, alias_data = _fetch_sheet_ranges([
+        "List!A1:I100",
+        "Type Validation!A1:Z50",
+        "Unique Column!A1:D100",
+    ])
 
     webhooks = _parse_list_sheet(list_data)
     categories_raw = _parse_type_validation_sheet(type_data)
@@ -523,7 +586,7 @@ def _load_categories_from_sheets() -> Dict[str, CategoryConfig]:
             category_type=cat["category_type"],
             marketplace=cat["marketplace"],
             bigquery_table=cat["bigquery_table"],
-            required_headers=cat["required_headers"],
+            required_headers=tuple(cat["required_headers"]),
             slack_webhook_url=webhooks.get(name, ""),
             header_row=cat["header_row"],
             data_start_row=cat["data_start_row"],
@@ -545,35 +608,59 @@ def load_categories() -> Dict[str, CategoryConfig]:
     If BigQuery doesn't have the data, triggers a sync from Google Sheets
     to BigQuery first, then reads from BigQuery.
 
-    Called once on startup, cached for function lifetime.
+    Cached per process: reloaded after CATEGORIES_TTL_SECONDS. If a reload
+    fails, the last good config keeps being served and the load is retried
+    after CATEGORIES_RETRY_SECONDS.
     """
+    return _get_categories_cache()[1]
+
+
+def _get_categories_cache() -> Tuple[float, Dict[str, CategoryConfig], Dict[str, CategoryConfig]]:
+    """Get the categories cache entry, (re)loading it if expired."""
     global _categories_cache
 
-    if _categories_cache is not None:
+    cached = _categories_cache
+    if cached is not None and time.monotonic() < cached[0]:
+        return cached
+
+    with _categories_lock:
+        # Another thread may have loaded it while we waited
+        cached = _categories_cache
+        if cached is not None and time.monotonic() < cached[0]:
+            return cached
+
+        categories = _load_categories()
+        if categories:
+            # Reversed so the first of any names differing only in case wins
+            categories_lower = {name.lower(): config for name, config in reversed(categories.items())}
+            _categories_cache = (time.monotonic() + CATEGORIES_TTL_SECONDS, categories, categories_lower)
+        else:
+            previous = cached[1:] if cached is not None else ({}, {})
+            _categories_cache = (time.monotonic() + CATEGORIES_RETRY_SECONDS, *previous)
         return _categories_cache
 
+
+def _load_categories() -> Dict[str, CategoryConfig]:
+    """Load categories from BigQuery, syncing from Sheets first if missing ({} on failure)."""
     logger.info("Loading config from BigQuery...")
 
     try:
-        # Try BigQuery first
+        # Try BigQuery first ({} means the config is there but empty)
         categories = _load_categories_from_bigquery()
 
-        if categories:
-            _categories_cache = categories
+        if categories is not None:
             return categories
 
         # BigQuery doesn't have data - sync from Sheets first
         logger.info("BigQuery config not found, syncing from Google Sheets...")
-        from admin_sync import sync_categories, sync_type_validation
+        from admin_sync import sync_category_config
 
-        sync_categories()
-        sync_type_validation()
+        sync_category_config()
 
         # Now read from BigQuery
         categories = _load_categories_from_bigquery()
 
         if categories:
-            _categories_cache = categories
             return categories
 
         # If still no data, something is wrong
@@ -598,19 +685,14 @@ def get_category(name: str) -> Optional[CategoryConfig]:
     Case-insensitive lookup to handle variations like
     'BA DASH TIK' vs 'BA Dash TIK'.
     """
-    categories = get_categories()
+    _, categories, categories_lower = _get_categories_cache()
 
     # Try exact match first
     if name in categories:
         return categories[name]
 
     # Try case-insensitive match
-    name_lower = name.lower()
-    for cat_name, config in categories.items():
-        if cat_name.lower() == name_lower:
-            return config
-
-    return None
+    return categories_lower.get(name.lower())
 
 
 def get_slack_webhook(category_name: str) -> str:
@@ -624,5 +706,6 @@ def get_slack_webhook(category_name: str) -> str:
 def reload_categories() -> Dict[str, CategoryConfig]:
     """Force reload categories."""
     global _categories_cache
-    _categories_cache = None
+    with _categories_lock:
+        _categories_cache = None
     return load_categories()
@@ -28,7 +28,16 @@ from parser import parse_file
 from bigquery_loader import get_loader
 from slack_notifier import get_notifier
 from brand_detector import detect_brand_from_data, detect_brand_from_filename, is_legacy_detection_enabled
-from utils.gcs_utils import download_blob_as_bytes, list_blobs_in_folder, move_to_archive, move_to_failed, upload_blob
+from utils.gcs_utils import (
+    download_blob_as_bytes,
+    download_blobs_as_bytes,
+    list_blobs_in_folder,
+    move_all_to_archive,
+    move_all_to_failed,
+    move_to_archive,
+    move_to_failed,
+    upload_blob,
+)
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -389,11 +398,10 @@ async def batch_process_category(category_name: str) -> dict:
     processed_files = []
     failed_files = []
 
-    for blob_path in blob_paths:
+    # Downloads run concurrently ahead of parsing; files are still handled in order
+    for blob_path, file_content in download_blobs_as_bytes(bucket_name, blob_paths):
         filename = blob_path.split("/")[-1]
 
-        # Download file
-        file_content = download_blob_as_bytes(bucket_name, blob_path)
         if not file_content:
             logger.error(
                 f"FILE FAILED (batch): Could not download file from GCS. "
@@ -404,7 +412,6 @@ async def batch_process_category(category_name: str) -> dict:
                 path=blob_path,
             )
             failed_files.append({"path": blob_path, "error": "Download failed"})
-            move_to_failed(bucket_name, blob_path)
             continue
 
         # Parse file
@@ -424,7 +431,6 @@ async def batch_process_category(category_name: str) -> dict:
                 path=blob_path,
             )
             failed_files.append({"path": blob_path, "error": error_msg})
-            move_to_failed(bucket_name, blob_path)
             continue
 
         # Extract brand code
@@ -465,7 +471,6 @@ async def batch_process_category(category_name: str) -> dict:
                     path=blob_path,
                 )
                 failed_files.append({"path": blob_path, "error": f"Invalid brand code: {brand_code}"})
-                move_to_failed(bucket_name, blob_path)
                 continue
 
         # Add brand code to each row and accumulate
@@ -480,6 +485,9 @@ async def batch_process_category(category_name: str) -> dict:
         processed_files.append(blob_path)
         logger.info(f"Parsed {filename}: {len(parsed.rows)} rows, brand={brand_code}")
 
+    # Move the files that failed individually in one concurrent pass
+    move_all_to_failed(bucket_name, [f["path"] for f in failed_files])
+
     if not all_rows:
         logger.error(
             f"BATCH FAILED: No valid data found in any of the {len(blob_paths)} files for {category_name}. "
@@ -525,8 +533,7 @@ async def batch_process_category(category_name: str) -> dict:
             bq_errors=str(bq_errors[:3]) if bq_errors else "none",
         )
         # Move all processed files to failed
-        for blob_path in processed_files:
-            move_to_failed(bucket_name, blob_path)
+        move_all_to_failed(bucket_name, processed_files)
         return {
             "success": False,
             "error": error_msg,
@@ -534,8 +541,7 @@ async def batch_process_category(category_name: str) -> dict:
         }
 
     # 6. Archive all processed files
-    for blob_path in processed_files:
-        move_to_archive(bucket_name, blob_path)
+    move_all_to_archive(bucket_name, processed_files)
 
     duration = time.time() - start_time
     rows_inserted = result.get("rows_inserted", 0)
@@ -710,13 +716,18 @@ def http_handler(request: Request):
 
     if path == "/sync" and request.method == "POST":
         # Sync Admin Sheet to BigQuery (called by Cloud Scheduler daily)
-        from admin_sync import sync_all
+        from admin_sync import VALIDATION_SHEETS, sync_all
+        from brand_detector import warm_validation_cache
 
         try:
             result = sync_all()
             success = len(result.get("errors", [])) == 0
             status_code = 200 if success else 500
 
+            # Refresh this instance's brand validation cache from the
+            # just-synced tables in one query (instead of one per category)
+            warm_validation_cache(VALIDATION_SHEETS)
+
             logger.info(
                 "Admin sync completed",
                 total_rows=result.get("total_rows"),
@@ -7,6 +7,7 @@ Includes column mapping to normalize data to standard column order.
 """
 
 import csv
+import functools
 import io
 import re
 from datetime import datetime
@@ -79,6 +80,16 @@ class ParsedFile:
         }
 
 
+# clean_header character classes: kept as-is / collapsed into one "_"
+_HEADER_KEEP_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789")
+_HEADER_SEPARATOR_CHARS = frozenset("-._")
+
+# Headers that are already clean: [a-z0-9] words joined by single underscores
+_CLEAN_HEADER_RE = re.compile(r"[a-z0-9]+(?:_[a-z0-9]+)*")
+
+
+# typed=True: 1, 1.0 and True are equal keys but clean to "1", "1_0", "true"
+@functools.lru_cache(maxsize=4096, typed=True)
 def clean_header(header: str) -> str:
     """
     Clean a header string for use as a column name.
@@ -87,25 +98,31 @@ def clean_header(header: str) -> str:
     - Replaces spaces with underscores
     - Removes special characters
     - Converts to lowercase
+
+    Single pass over the characters (no regex): runs of whitespace, "-",
+    "." and "_" become one underscore, other non [a-z0-9] characters are
+    dropped, and leading/trailing underscores are never emitted.
     """
     if not header:
         return ""
 
-    cleaned = str(header).strip().lower()
-
-    # Replace spaces and special chars with underscores
-    cleaned = re.sub(r'[\s\-\.]+', '_', cleaned)
+    # Fast path: already-clean headers come back unchanged
+    if isinstance(header, str) and _CLEAN_HEADER_RE.fullmatch(header):
+        return header
 
-    # Remove characters that aren't alphanumeric or underscore
-    cleaned = re.sub(r'[^a-z0-9_]', '', cleaned)
+    out = []
+    pending_underscore = False
 
-    # Remove multiple consecutive underscores
-    cleaned = re.sub(r'_+', '_', cleaned)
+    for ch in str(header).lower():
+        if ch in _HEADER_KEEP_CHARS:
+            if pending_underscore and out:
+                out.append("_")
+            pending_underscore = False
+            out.append(ch)
+        elif ch in _HEADER_SEPARATOR_CHARS or ch.isspace():
+            pending_underscore = True
 
-    # Remove leading/trailing underscores
-    cleaned = cleaned.strip('_')
-
-    return cleaned
+    return "".join(out)
 
 
 def parse_number(value: Any) -> Optional[Union[int, float]]:
@@ -498,6 +515,11 @@ def parse_file(
         # No standard headers defined - use raw data
         output_headers, parsed_rows = _parse_raw_data(headers, filtered_rows, errors)
 
+    # The raw cell lists are no longer needed once rows are mapped; drop them
+    # so they aren't held alongside the final rows
+    total_rows = len(raw_rows)
+    del raw_rows, filtered_rows
+
     # Clean headers for BigQuery column names
     cleaned_headers = [clean_header(h) for h in output_headers]
 
@@ -514,15 +536,15 @@ def parse_file(
             seen[h] = 0
             unique_headers.append(h)
 
-    # Convert row dicts to use cleaned headers
-    final_rows = []
-    for row in parsed_rows:
-        final_row = {}
-        for i, orig_header in enumerate(output_headers):
-            if i < len(unique_headers):
-                value = row.get(orig_header, "")
-                final_row[unique_headers[i]] = parse_cell_value(value, unique_headers[i])
-        final_rows.append(final_row)
+    # Convert positional rows to dicts keyed by cleaned headers.
+    # Rows are replaced in place, so each intermediate list is freed as soon
+    # as its dict exists (one full copy of the rows at a time)
+    final_rows = parsed_rows
+    for i, row in enumerate(final_rows):
+        final_rows[i] = {
+            clean: parse_cell_value(value, clean)
+            for clean, value in zip(unique_headers, row)
+        }
 
     logger.info(
         f"Parsed {filename}: {len(final_rows)} rows, {skipped} skipped, mapped={column_mapped}",
@@ -537,7 +559,7 @@ def parse_file(
         headers=unique_headers,
         rows=final_rows,
         category=category,
-        total_rows=len(raw_rows),
+        total_rows=total_rows,
         skipped_rows=skipped,
         errors=errors,
         column_mapped=column_mapped,
@@ -549,24 +571,22 @@ def _parse_raw_data(
     headers: List[str],
     rows: List[List[Any]],
     errors: List[str],
-) -> Tuple[List[str], List[Dict[str, Any]]]:
+) -> Tuple[List[str], List[List[Any]]]:
     """
     Parse raw data without column mapping (fallback).
 
     Returns:
-        Tuple of (headers, rows as list of dicts)
+        Tuple of (headers, rows as lists aligned with headers)
     """
     parsed_rows = []
+    num_columns = len(headers)
 
     for row_idx, row in enumerate(rows):
         try:
-            row_dict = {}
-            for col_idx, header in enumerate(headers):
-                if col_idx < len(row):
-                    row_dict[header] = row[col_idx]
-                else:
-                    row_dict[header] = ""
-            parsed_rows.append(row_dict)
+            # Truncate or pad with "" to exactly one value per header
+            row_values = list(row[:num_columns])
+            row_values.extend([""] * (num_columns - len(row_values)))
+            parsed_rows.append(row_values)
         except Exception as e:
             errors.append(f"Row {row_idx}: {str(e)}")
 
@@ -0,0 +1,10 @@
+"""
+iBot v2 test configuration
+
+Makes the function's top-level modules importable as they are when deployed.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
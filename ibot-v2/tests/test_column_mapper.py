@@ -0,0 +1,42 @@
+"""
+SUM_STARTS_WITH parsing tests
+
+Text cells must sum exactly as the original replace-then-float() parse did,
+since v1 parity is checked row by row by compare_results.py.
+"""
+
+from column_mapper import apply_sum_starts_with
+
+
+def _sum(*cells):
+    return apply_sum_starts_with(list(cells), list(range(len(cells))))
+
+
+def test_indonesian_text_cells():
+    assert _sum("1.234") == "1234"
+    assert _sum("-1.234,5") == "-1234.5"
+    assert _sum("12,") == "12"
+    assert _sum("2,8.6") == "2.86"
+
+
+def test_separators_keep_original_semantics():
+    # "." is always a thousands separator and "," the decimal point
+    assert _sum("1,234.5") == "1.2345"
+    assert _sum("1,234") == "1.234"
+    assert _sum(" 71 .. ") == "71"
+
+
+def test_non_numeric_text_is_skipped():
+    assert _sum("-") == ""
+    assert _sum("N/A") == ""
+    assert _sum("#N/A") == ""
+    assert _sum("") == ""
+    assert _sum("1,234,567") == ""
+    assert _sum("-", "N/A", "5") == "5"
+
+
+def test_numeric_cells_are_added_as_is():
+    assert _sum(1234) == "1234"
+    assert _sum(2.5) == "2.5"
+    assert _sum(1234, 2.5, "1.000") == "2236.5"
+    assert _sum(None, True) == ""
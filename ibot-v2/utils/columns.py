@@ -0,0 +1,34 @@
+"""
+iBot v2 Column Naming
+
+Excel-style column names (A, B, ..., Z, AA, AB, ...) shared by the
+BigQuery loader and the admin sync.
+"""
+
+import functools
+from typing import Tuple
+
+
+@functools.lru_cache(maxsize=4096)
+def get_column_name(index: int) -> str:
+    """
+    Convert column index to Excel-style column name.
+    0 -> A, 1 -> B, ..., 25 -> Z, 26 -> AA, 27 -> AB, etc.
+    """
+    result = ""
+    while True:
+        result = chr(ord('A') + (index % 26)) + result
+        index = index // 26 - 1
+        if index < 0:
+            break
+    return result
+
+
+@functools.lru_cache(maxsize=256)
+def column_names(n: int) -> Tuple[str, ...]:
+    """
+    Get the first n Excel-style column names.
+
+    Returned as a tuple so the cached value can't be mutated by callers.
+    """
+    return tuple(get_column_name(i) for i in range(n))
@@ -5,7 +5,9 @@ Handles Google Cloud Storage operations like moving files
 between folders (archive, failed).
 """
 
-from typing import List, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Deque, Iterator, List, Optional, Tuple
 from google.cloud import storage
 
 from utils.logger import get_logger
@@ -15,6 +17,9 @@ logger = get_logger(__name__)
 # Singleton storage client
 _storage_client: Optional[storage.Client] = None
 
+# Concurrent GCS requests for multi-file operations (downloads, moves)
+GCS_MAX_WORKERS = 8
+
 
 def get_storage_client() -> storage.Client:
     """Get or create GCS client."""
@@ -147,6 +152,38 @@ def move_to_failed(bucket_name: str, blob_path: str) -> bool:
     return move_blob(bucket_name, blob_path, failed_path)
 
 
+def move_all_to_archive(bucket_name: str, blob_paths: List[str]) -> int:
+    """
+    Move several processed files to the archive folder concurrently.
+
+    Returns:
+        Number of files moved successfully
+    """
+    return _move_all(move_to_archive, bucket_name, blob_paths)
+
+
+def move_all_to_failed(bucket_name: str, blob_paths: List[str]) -> int:
+    """
+    Move several failed files to the failed folder concurrently.
+
+    Returns:
+        Number of files moved successfully
+    """
+    return _move_all(move_to_failed, bucket_name, blob_paths)
+
+
+def _move_all(move_fn, bucket_name: str, blob_paths: List[str]) -> int:
+    """Run move_fn for each blob on a thread pool (each move is copy + delete RPCs)."""
+    if not blob_paths:
+        return 0
+
+    # Create the shared client before the workers race to do it
+    get_storage_client()
+
+    with ThreadPoolExecutor(max_workers=min(GCS_MAX_WORKERS, len(blob_paths))) as executor:
+        return sum(executor.map(lambda path: move_fn(bucket_name, path), blob_paths))
+
+
 def list_blobs_in_folder(
     bucket_name: str,
     folder_path: str,
@@ -234,6 +271,55 @@ def download_blob_as_bytes(bucket_name: str, blob_path: str) -> Optional[bytes]:
         return None
 
 
+def download_blobs_as_bytes(
+    bucket_name: str,
+    blob_paths: List[str],
+) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """
+    Download several blobs concurrently, yielding them in the given order.
+
+    Later files download in the background while the caller works on the
+    earlier ones. At most GCS_MAX_WORKERS downloads run ahead of the caller,
+    so a large batch is never held in memory all at once; if the caller
+    stops early, downloads that haven't started are cancelled.
+
+    Args:
+        bucket_name: GCS bucket name
+        blob_paths: Paths to the blobs
+
+    Yields:
+        (blob_path, content) pairs; content is None if that download failed
+    """
+    if not blob_paths:
+        return
+
+    # Create the shared client before the workers race to do it
+    get_storage_client()
+
+    executor = ThreadPoolExecutor(max_workers=min(GCS_MAX_WORKERS, len(blob_paths)))
+    remaining = iter(blob_paths)
+    pending: Deque[Tuple[str, Future]] = deque()
+
+    def submit_next() -> None:
+        path = next(remaining, None)
+        if path is not None:
+            pending.append((path, executor.submit(download_blob_as_bytes, bucket_name, path)))
+
+    try:
+        for _ in range(GCS_MAX_WORKERS):
+            submit_next()
+
+        while pending:
+            path, future = pending.popleft()
+            content = future.result()
+            # Keep the window full while the caller works on this file
+            submit_next()
+            yield path, content
+    finally:
+        # Don't wait on (or start) downloads nobody will read
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def upload_blob(bucket_name: str, blob_path: str, content: bytes) -> bool:
     """
     Upload content to a blob in GCS.
@@ -0,0 +1,44 @@
+"""
+iBot v2 NDJSON Encoding
+
+Newline-delimited JSON buffers for BigQuery load jobs, shared by the
+BigQuery loader and the admin sync.
+"""
+
+import io
+import json
+from typing import Any, Dict, Iterable, Tuple
+
+# Use orjson for row serialization when installed (~3x faster than json)
+try:
+    import orjson
+    ORJSON_SUPPORT = True
+except ImportError:
+    ORJSON_SUPPORT = False
+
+
+def dumps_row(row: Dict[str, Any]) -> bytes:
+    """Serialize a row to a JSON line (without trailing newline)."""
+    if ORJSON_SUPPORT:
+        return orjson.dumps(row)
+    return json.dumps(row).encode("utf-8")
+
+
+def ndjson_buffer(rows: Iterable[Dict[str, Any]]) -> Tuple[io.BytesIO, int]:
+    """
+    Serialize rows into an in-memory NDJSON file.
+
+    Rows are consumed one at a time, so a generator of rows never exists
+    as a list of dicts - only as the encoded bytes.
+
+    Returns:
+        Tuple of (json_file positioned at 0, row_count)
+    """
+    json_file = io.BytesIO()
+    row_count = 0
+    for row in rows:
+        json_file.write(dumps_row(row))
+        json_file.write(b"\n")
+        row_count += 1
+    json_file.seek(0)
+    return json_file, row_count